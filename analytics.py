@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Analytics
+
+Community stats kept as precomputed tables:
+
+    brackets  votes per bracket per month, for popularity over time
+    crowd     each settled month's most popular (modal) bracket against the
+              close, and the vote-weighted crowd estimate's error
+    players   per-player calibration: hits against what the crowd's split
+              implied, bullish/bearish bias and average distance
+
+Analytics works like StandingsEngine: each month's rows are kept with the
+month's fingerprint, and sync() recomputes only months that changed (a new
+vote, a settled price) and adjusts the per-player running totals. tables()
+is built once per change, so queries never re-aggregate the votes.
+
+A bracket's "anchor" is its midpoint, or its finite bound for open-ended
+brackets like "< $90k", and stands in for the guess in the crowd estimate
+and bias.
+
+Usage:
+    python3 analytics.py                # crowd vs price, then calibration
+    python3 analytics.py --json crowd   # one table as JSON
+"""
+
+import argparse
+import json
+import threading
+
+from model import as_polls
+from scoring import group_by_bracket
+
+TABLES = ('brackets', 'crowd', 'players')
+# Running per-player sums behind the players table
+TOTALS = ('votes', 'hits', 'expected', 'bias', 'distance')
+
+def anchor(r) -> float:
+    """A single price standing in for a bracket"""
+    if r.max == float('inf'):
+        return r.min
+    if r.open_min:
+        return r.max
+    return (r.min + r.max) / 2
+
+def _bound(value):
+    return None if value in (float('inf'), float('-inf')) else value
+
+def month_rows(month, price_key: str = 'bitcoin_usd_price') -> dict:
+    """Everything the tables need from one month"""
+    price = month.price(price_key)
+    groups = group_by_bracket(month.votes)
+    total = len(month.votes)
+    brackets = []
+    for guess, indexes in groups.items():
+        r = month.votes[indexes[0]].range
+        brackets.append({'guess': guess, 'low': _bound(r.min) if not r.open_min else None, 'high': _bound(r.max),
+                         'votes': len(indexes), 'share': round(len(indexes) / total, 4),
+                         'correct': r.contains(price) if price else None,
+                         '_range': r})
+    brackets.sort(key=lambda b: (b['_range'].min, b['_range'].max))
+    row = {'key': month.key, 'label': month.label, 'fingerprint': month.fingerprint, 'price': price,
+           'votes': total, 'brackets': brackets, 'crowd': None, 'players': {}}
+    if not price or not total:
+        return row
+
+    top = max(b['votes'] for b in brackets)
+    modal = [b for b in brackets if b['votes'] == top]
+    estimate = sum(anchor(b['_range']) * b['votes'] for b in brackets) / total
+    row['crowd'] = {
+        'month': month.key, 'label': month.label, 'price': price,
+        'modal': [b['guess'] for b in modal], 'modal_share': modal[0]['share'],
+        'modal_correct': any(b['correct'] for b in modal),
+        'modal_distance': min(b['_range'].distance(price) for b in modal),
+        'estimate': round(estimate, 2), 'error_pct': round((estimate - price) / price * 100, 2),
+        'correct_share': round(sum(b['share'] for b in brackets if b['correct']), 4),
+    }
+    shares = {b['guess']: b['share'] for b in brackets}
+    for v in month.votes:
+        row['players'][v.name] = {
+            'hit': v.range.contains(price),
+            # The crowd's split as a forecast: the chance it gave this bracket
+            'implied': shares[v.guess],
+            'bias': round((anchor(v.range) - price) / price, 6),
+            'distance': v.range.distance(price),
+        }
+    return row
+
+class Analytics:
+    """Precomputed community stats, updated one month at a time. Hold lock when shared."""
+
+    def __init__(self, price_key: str = 'bitcoin_usd_price'):
+        self.price_key = price_key
+        self.months = {}
+        self.players = {}
+        self.lock = threading.RLock()
+        self._tables = None
+
+    def sync(self, data) -> bool:
+        """Bring the tables up to date with raw data or model.Polls; returns whether anything changed"""
+        polls = as_polls(data)
+        changed = False
+        for key in list(self.months):
+            if key not in polls.months:
+                self.remove_month(key)
+                changed = True
+        for key, month in polls.months.items():
+            entry = self.months.get(key)
+            if entry is None or entry['fingerprint'] != month.fingerprint:
+                self.update_month(month)
+                changed = True
+        if changed or self._tables is None:
+            # Month order follows the data, as the standings do
+            self.months = {key: self.months[key] for key in polls.months}
+            self._tables = None
+        return changed
+
+    def update_month(self, month):
+        if month.key in self.months:
+            self.remove_month(month.key)
+        row = month_rows(month, self.price_key)
+        self.months[month.key] = row
+        for name, vote in row['players'].items():
+            self._add(self.players.setdefault(name, dict.fromkeys(TOTALS, 0)), vote, 1)
+        self._tables = None
+
+    def remove_month(self, key: str):
+        row = self.months.pop(key)
+        for name, vote in row['players'].items():
+            totals = self.players[name]
+            self._add(totals, vote, -1)
+            if not totals['votes']:
+                del self.players[name]
+        self._tables = None
+
+    @staticmethod
+    def _add(totals: dict, vote: dict, sign: int):
+        totals['votes'] += sign
+        totals['hits'] += sign * vote['hit']
+        # Rounded so removing a month undoes adding it exactly, as in StandingsEngine
+        for field, value in (('expected', vote['implied']), ('bias', vote['bias']), ('distance', vote['distance'])):
+            totals[field] = round(totals[field] + sign * value, 6)
+
+    def tables(self) -> dict:
+        """{'brackets': [...], 'crowd': [...], 'players': [...]}, built once per change"""
+        if self._tables is None:
+            self._tables = {
+                'brackets': [{'month': row['key'], 'label': row['label'], 'price': row['price'],
+                              'votes': row['votes'],
+                              'brackets': [{k: v for k, v in b.items() if k != '_range'} for b in row['brackets']]}
+                             for row in self.months.values()],
+                'crowd': [row['crowd'] for row in self.months.values() if row['crowd']],
+                'players': sorted((self._player(name, t) for name, t in self.players.items()),
+                                  key=lambda p: (-p['hits_vs_crowd'], -p['votes'], p['name'])),
+            }
+        return self._tables
+
+    @staticmethod
+    def _player(name: str, t: dict) -> dict:
+        n = t['votes']
+        return {
+            'name': name, 'votes': n, 'hits': t['hits'],
+            'hit_rate': round(t['hits'] / n, 4),
+            'crowd_rate': round(t['expected'] / n, 4),
+            # Hits beyond what backing the crowd's odds would have earned
+            'hits_vs_crowd': round(t['hits'] - t['expected'], 4),
+            'bias_pct': round(t['bias'] / n * 100, 2),
+            'avg_distance': round(t['distance'] / n, 2),
+        }
+
+def main(argv=None):
+    from calculate_points import DATA_FILE
+    from startup import load_polls
+
+    parser = argparse.ArgumentParser(description="WA Bitcoiners Vote community stats")
+    parser.add_argument('--json', choices=TABLES, help="print one table as JSON")
+    args = parser.parse_args(argv)
+
+    analytics = Analytics()
+    analytics.sync(load_polls(DATA_FILE)[1])
+    tables = analytics.tables()
+    if args.json:
+        print(json.dumps(tables[args.json], indent=2, ensure_ascii=False))
+        return
+
+    print("📈 CROWD VS PRICE")
+    for c in tables['crowd']:
+        mark = "🎯" if c['modal_correct'] else "❌"
+        print(f"  {mark} {c['label']}: crowd picked {' / '.join(c['modal'])} ({c['modal_share']:.0%}), "
+              f"closed ${c['price']:,.0f}; crowd estimate ${c['estimate']:,.0f} ({c['error_pct']:+.1f}%)")
+    hits = sum(c['modal_correct'] for c in tables['crowd'])
+    print(f"  Crowd right {hits}/{len(tables['crowd'])} months")
+    print("\n🎯 CALIBRATION (hits vs what the crowd's odds implied)")
+    for p in tables['players']:
+        print(f"  {p['name']}: {p['hits']}/{p['votes']} hits, crowd odds {p['crowd_rate']:.0%}, "
+              f"{p['hits_vs_crowd']:+.2f} vs crowd, bias {p['bias_pct']:+.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+WA Bitcoiners Vote - JSON API
+
+ApiIndex precomputes every API document once per data version; requests
+then only slice and encode. Encoded responses (plain and gzip) are memoized
+per path and query, with ETags for conditional GETs.
+
+    /api/standings              overall standings
+    /api/months                 month summaries
+    /api/months/<key>           one month's results
+    /api/yearly/<year>          yearly predictions
+    /api/yearly/<year>/leaders  who wins if the year closed at ?price=P (default: latest close)
+    /api/yearly/<year>/table    winning brackets for every price range
+    /api/players/<name>         one player's stats and history (aliases resolved)
+    /api/analytics/brackets     votes per bracket, month by month
+    /api/analytics/crowd        the crowd's modal bracket and estimate against each close
+    /api/analytics/players      per-player calibration against the crowd's odds
+
+The analytics documents are slices of analytics.Analytics tables, which
+are only re-aggregated for months that change.
+
+List endpoints take ?limit=N (default 50, max 500) and ?cursor=... from the
+previous response's next_cursor.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+from collections import namedtuple
+from urllib.parse import unquote
+
+from metrics import CACHE_LOOKUPS
+from players import PlayerIndex
+from yearly import YearlyIndex, latest_close
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_CACHED_RESPONSES = 1024
+GZIP_MIN_BYTES = 512
+
+ApiResponse = namedtuple('ApiResponse', 'status body etag encoding')
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def paginate(items: list, query: dict) -> dict:
+    try:
+        limit = int(query.get('limit', [DEFAULT_LIMIT])[0])
+        offset = int(query.get('cursor', ['0'])[0] or 0)
+    except ValueError:
+        raise ApiError(400, "limit and cursor must be integers")
+    if not 1 <= limit <= MAX_LIMIT or offset < 0:
+        raise ApiError(400, f"limit must be 1-{MAX_LIMIT} and cursor non-negative")
+    end = offset + limit
+    return {
+        'items': items[offset:end],
+        'total': len(items),
+        'next_cursor': str(end) if end < len(items) else None,
+    }
+
+class ApiIndex:
+    """Every API document for one version of the data"""
+
+    def __init__(self, data: dict, standings: list, months: dict, aliases: dict = None, analytics: dict = None):
+        self.standings = [{'rank': i, 'name': s['name'], 'points': s['points'], 'wins': s['wins']}
+                          for i, s in enumerate(standings, 1)]
+        self.months = {}
+        for key, month_data in data.get('monthly', {}).items():
+            entry = months.get(key, {})
+            self.months[key] = {
+                'key': key,
+                'month': month_data.get('month', key),
+                'price': entry.get('price'),
+                'correct_range': month_data.get('correct_range'),
+                'notes': month_data.get('notes'),
+                'votes': len(month_data.get('participants', [])),
+                'results': [{'name': r['name'], 'guess': r['guess'], 'points': r['points'], 'correct': r['correct']}
+                            for r in entry.get('results', [])],
+            }
+        self.month_list = [{k: m[k] for k in ('key', 'month', 'price', 'correct_range', 'votes')}
+                           for m in self.months.values()]
+        self.yearly = {str(key): {'year': poll.get('year', key), 'price': poll.get('bitcoin_usd_price'),
+                                  'notes': poll.get('notes'), 'participants': poll.get('participants', [])}
+                       for key, poll in data.get('yearly', {}).items()}
+        self.yearly_index = {str(key): YearlyIndex(poll.get('participants', []))
+                             for key, poll in data.get('yearly', {}).items()}
+        self.latest_close = latest_close(data)[1]
+        self.player_index = PlayerIndex(months, aliases)
+        self.ranks = {}
+        for row in self.standings:
+            self.ranks.setdefault(self.player_index.resolve(row['name']), row['rank'])
+        self.analytics = analytics or {}
+        self._responses = {}
+
+    def document(self, path: str, query: dict) -> dict:
+        parts = [unquote(p) for p in path.strip('/').split('/')[1:]]
+        if parts == ['standings']:
+            return paginate(self.standings, query)
+        if parts == ['months']:
+            return paginate(self.month_list, query)
+        if len(parts) == 2 and parts[0] == 'months':
+            month = self.months.get(parts[1])
+            if month is None:
+                raise ApiError(404, f"No month {parts[1]!r}")
+            return {**{k: v for k, v in month.items() if k != 'results'}, **paginate(month['results'], query)}
+        if len(parts) == 2 and parts[0] == 'yearly':
+            poll = self.yearly.get(parts[1])
+            if poll is None:
+                raise ApiError(404, f"No yearly poll {parts[1]!r}")
+            return {**{k: v for k, v in poll.items() if k != 'participants'}, **paginate(poll['participants'], query)}
+        if len(parts) == 3 and parts[0] == 'yearly' and parts[1] in self.yearly:
+            return self.yearly_resolution(parts[1], parts[2], query)
+        if len(parts) == 2 and parts[0] == 'players':
+            return self.player(parts[1], query)
+        if len(parts) == 2 and parts[0] == 'analytics' and parts[1] in self.analytics:
+            return paginate(self.analytics[parts[1]], query)
+        raise ApiError(404, "Unknown API endpoint")
+
+    def yearly_resolution(self, year: str, view: str, query: dict) -> dict:
+        index = self.yearly_index[year]
+        if view == 'table':
+            return {'year': self.yearly[year]['year'],
+                    'regions': [{'low': r.low if r.low != float('-inf') else None,
+                                 'high': r.high if r.high != float('inf') else None,
+                                 'brackets': list(r.brackets)} for r in index.table()]}
+        if view != 'leaders':
+            raise ApiError(404, "Unknown API endpoint")
+        try:
+            price = float(query['price'][0]) if 'price' in query else self.yearly[year]['price'] or self.latest_close
+        except ValueError:
+            raise ApiError(400, "price must be a number")
+        if price is not None and not math.isfinite(price):
+            raise ApiError(400, "price must be a number")
+        if price is None:
+            raise ApiError(404, "No price to resolve at; pass ?price=")
+        return {'year': self.yearly[year]['year'], 'price': price,
+                'brackets': index.winning_brackets(price), 'names': index.winners_at(price)}
+
+    def player(self, name: str, query: dict) -> dict:
+        index = self.player_index
+        if name not in index:
+            raise ApiError(404, f"No player {name!r}")
+        history = [{'month': v.month, 'label': v.label, 'price': v.price, 'guess': v.guess,
+                    'points': v.points, 'correct': v.correct, 'distance': v.distance}
+                   for v in index.history(name)]
+        return {'rank': self.ranks.get(index.resolve(name)), **index.stats(name), **paginate(history, query)}
+
+    def response(self, path: str, query: dict, accept_gzip: bool) -> ApiResponse:
+        """Encoded response, memoized per path, query and encoding"""
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items() if k in ('limit', 'cursor', 'price'))), accept_gzip)
+        cached = self._responses.get(key)
+        if cached:
+            CACHE_LOOKUPS.inc('api_response', 'hit')
+            return cached
+        CACHE_LOOKUPS.inc('api_response', 'miss')
+        try:
+            status, doc = 200, self.document(path, query)
+        except ApiError as e:
+            status, doc = e.status, {'error': str(e)}
+        body = json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        encoding = None
+        if accept_gzip and len(body) >= GZIP_MIN_BYTES:
+            body, etag, encoding = gzip.compress(body, mtime=0), etag + '-gz', 'gzip'
+        response = ApiResponse(status, body, f'"{etag}"', encoding)
+        if len(self._responses) >= MAX_CACHED_RESPONSES:
+            self._responses.clear()
+        self._responses[key] = response
+        return response
@@ -3,82 +3,232 @@
 WA Bitcoiners Vote - Beautiful Results Website
 """
 
+import argparse
+import hashlib
 import json
+import re
+import sys
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from html import escape
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+
+import groups
+import images
+import live
+import metrics
+import model
+import prices
+from analytics import Analytics
+from api import ApiIndex
+from calculate_points import score_month
+from guesses import parse_guess
+from model import as_polls
+from players import ALIASES_FILE, load_aliases
+from poll_log import open_source
+from standings import StandingsEngine
+from yearly import YearlyIndex, latest_close
 
 DATA_FILE = Path(__file__).parent / "data" / "polls.json"
 
-def load_data():
-    return json.loads(DATA_FILE.read_text())
+IMPORT_RE = re.compile(r'^[ \t]*(?:from[ \t]+(\w+)[ \t]+import\b|import[ \t]+(\w+(?:[ \t]*,[ \t]*\w+)*))', re.M)
 
-def calculate_monthly(data, month_key, actual_price):
-    """Calculate monthly results"""
-    participants = data['monthly'][month_key].get('participants', [])
-    
-    parsed = []
-    for p in participants:
-        guess = p.get('guess', '')
-        # Parse guess
-        if '-' in guess or '–' in guess:
-            parts = guess.replace('–', '-').split('-')
+def render_sources(path: Path = None) -> list:
+    """path (default: app.py) and every repo module it imports, directly or not, going by its import lines"""
+    root = Path(__file__).resolve().parent
+    seen = set()
+    stack = [path or Path(__file__).resolve()]
+    while stack:
+        path = stack.pop()
+        if path in seen or not path.is_file():
+            continue
+        seen.add(path)
+        for m in IMPORT_RE.finditer(path.read_text()):
+            names = [m[1]] if m[1] else [name.strip() for name in m[2].split(',')]
+            stack += [root / f"{name}.py" for name in names]
+    return sorted(seen)
+
+@lru_cache(maxsize=None)
+def code_version() -> tuple:
+    """(digest, newest mtime) of the render sources.
+
+    Part of every page's ETag and Last-Modified, so after a deploy that
+    changes the template or a renderer, browsers get the new page rather
+    than a 304 for one the old code rendered.
+    """
+    sources = render_sources()
+    return (hashlib.sha256(b''.join(p.read_bytes() for p in sources)).hexdigest(),
+            max(p.stat().st_mtime for p in sources))
+
+def mtime_ns(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+Page = namedtuple('Page', 'stat_key digest body etag mtime last_modified')
+
+class Rendering:
+    """A page being rendered on its own thread; any number of clients can read the chunks as they arrive"""
+
+    def __init__(self, page, chunks):
+        self.page = page
+        self._chunks = []
+        self._done = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._fill, args=(chunks,), name='page-render', daemon=True)
+
+    def start(self, on_done):
+        self._on_done = on_done
+        self._thread.start()
+
+    def _fill(self, chunks):
+        try:
+            for chunk in chunks:
+                with self._cond:
+                    self._chunks.append(chunk)
+                    self._cond.notify_all()
+        except Exception as e:
+            self._error = e
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+        self._on_done(self)
+
+    def stream(self):
+        """Yield the chunks, waiting for the ones not rendered yet"""
+        i = 0
+        while True:
+            with self._cond:
+                while i == len(self._chunks) and not self._done:
+                    self._cond.wait()
+                new, done = self._chunks[i:], self._done
+            i += len(new)
+            yield from new
+            if done and i == len(self._chunks):
+                if self._error:
+                    raise self._error
+                return
+
+    def result(self):
+        """The finished Page; waits for the render"""
+        return self.page._replace(body=b''.join(self.stream()))
+
+class RenderCache:
+    """Rendered page for a data source, rebuilt only when the data changes.
+
+    A stat() is all a request costs while the source's mtime and size are
+    unchanged. When they do change the source is re-read, and the page is
+    only re-rendered if the content digest differs. Other files the page
+    depends on (like the screenshot manifest) are tracked by mtime.
+
+    With stream=True, render returns an iterable of byte chunks. A miss
+    renders on a thread of its own; the caller and everyone who asks while
+    it runs read the chunks as they arrive, and a sink passed to get()
+    receives them. Clients only ever write outside the lock, so a slow or
+    vanished client holds up no one else and can't stop the page from
+    being cached.
+
+    render receives validated model.Polls. If a new version fails
+    validation, the errors are logged once and the last good page is kept.
+
+    Lookups are counted per name as hits (stat unchanged), revalidated
+    (re-read but same digest) or misses (re-rendered).
+    """
+
+    def __init__(self, name, source, render, depends=(), stream=False):
+        self.name = name
+        self.source = source
+        self.render = render
+        self.depends = depends
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._page = None
+        self._rendering = None
+
+    def get(self, sink=None):
+        st = self.source.stat()
+        stat_key = (st.st_mtime_ns, st.st_size) + tuple(mtime_ns(p) for p in self.depends)
+        page = self._page
+        if page and page.stat_key == stat_key:
+            metrics.CACHE_LOOKUPS.inc(self.name, 'hit')
+            return page
+        with self._lock:
+            page = self._page
+            if page and page.stat_key == stat_key:
+                metrics.CACHE_LOOKUPS.inc(self.name, 'hit')
+                return page
             try:
-                min_val = float(parts[0].replace('$','').replace('k','000').replace('K','000').strip())
-                max_val = float(parts[1].replace('$','').replace('k','000').replace('K','000').strip())
-                in_range = min_val <= actual_price <= max_val
-            except:
-                in_range = False
-        elif '<' in guess:
-            val = float(guess.replace('<','').replace('$','').replace('k','000').replace('K','000').strip())
-            in_range = actual_price < val
-        else:
-            in_range = False
-        
-        parsed.append({
-            'name': p['name'],
-            'guess': guess,
-            'correct': in_range
-        })
-    
-    return parsed
+                with metrics.stage('load_data'):
+                    digest, data = model.load(self.source)
+            except model.ValidationError as e:
+                if page is None:
+                    raise
+                print(f"Keeping the last good {self.name}: {e}")
+                self._page = page._replace(stat_key=stat_key)
+                return self._page
+            code_digest, code_mtime = code_version()
+            digest = hashlib.sha256(f"{digest}:{stat_key[2:]}:{code_digest}".encode()).hexdigest()
+            rendering = self._rendering
+            if page and page.digest == digest:
+                metrics.CACHE_LOOKUPS.inc(self.name, 'revalidated')
+                self._page = page._replace(stat_key=stat_key)
+                return self._page
+            if rendering is None or rendering.page.digest != digest:
+                # Only the server gets here; the email package is slow to import for one-off renders
+                from email.utils import formatdate
 
-def get_standings(data):
-    """Calculate overall standings"""
-    standings = {}
-    
-    for month, month_data in data.get('monthly', {}).items():
-        price = month_data.get('bitcoin_aud_price')
-        if price:
-            for p in month_data.get('participants', []):
-                name = p['name']
-                if name not in standings:
-                    standings[name] = {'name': name, 'points': 0, 'wins': 0, 'months': []}
-                
-                # Check if correct
-                guess = p.get('guess', '')
-                correct = False
-                if '-' in guess or '–' in guess:
-                    parts = guess.replace('–', '-').split('-')
-                    try:
-                        min_val = float(parts[0].replace('$','').replace('k','000').replace('K','000').strip())
-                        max_val = float(parts[1].replace('$','').replace('k','000').replace('K','000').strip())
-                        correct = min_val <= price <= max_val
-                    except:
-                        pass
-                
-                if correct:
-                    standings[name]['points'] += 3
-                    standings[name]['wins'] += 1
-                
-                standings[name]['months'].append({
-                    'month': month_data.get('month', month),
-                    'price': price,
-                    'guess': guess,
-                    'correct': correct
-                })
-    
-    return sorted(standings.values(), key=lambda x: (-x['points'], -x['wins']))
+                metrics.CACHE_LOOKUPS.inc(self.name, 'miss')
+                mtime = max([st.st_mtime, code_mtime] + [ns / 1e9 for ns in stat_key[2:]])
+                page = Page(stat_key, digest, None, f'"{digest[:32]}"', int(mtime), formatdate(mtime, usegmt=True))
+                if not self.stream:
+                    self._page = page._replace(body=self.render(data))
+                    return self._page
+                rendering = self._rendering = Rendering(page, self.render(data))
+                rendering.start(self._rendered)
+        if sink:
+            sink.start(rendering.page)
+            for chunk in rendering.stream():
+                sink.write(chunk)
+            sink.finish()
+        return rendering.result()
+
+    def _rendered(self, rendering):
+        with self._lock:
+            if self._rendering is rendering:
+                self._rendering = None
+                try:
+                    self._page = rendering.result()
+                except Exception as e:
+                    print(f"Rendering the {self.name} failed: {e}")
+
+    def invalidate(self):
+        """Re-check the source on the next get(), even if its mtime and size look unchanged"""
+        with self._lock:
+            if self._page:
+                self._page = self._page._replace(stat_key=None)
+
+def get_analytics(data, analytics=None) -> dict:
+    """The analytics tables, re-aggregating only months that changed"""
+    analytics = analytics or ANALYTICS
+    with analytics.lock, metrics.stage('analytics'):
+        analytics.sync(data)
+        return analytics.tables()
+
+def get_standings(data, engine=None):
+    """Calculate overall standings, re-scoring only months that changed"""
+    engine = engine or STANDINGS
+    with engine.lock, metrics.stage('standings'):
+        engine.sync(data)
+        return [{
+            'name': s['name'],
+            'points': s['points'],
+            'wins': s['wins'],
+            'months': [{'month': m['label'], 'price': m['price'], 'guess': r['guess'], 'correct': r['correct']}
+                       for m, r in engine.history(s['name'])],
+        } for s in engine.standings()]
 
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
@@ -164,6 +314,8 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         }
         
         .card-title { font-size: 1.5rem; color: #f7931a; }
+        .card-title a { color: inherit; text-decoration: none; }
+        .card-title a:hover { text-decoration: underline; }
         
         .price-badge {
             background: linear-gradient(90deg, #f7931a, #ff6b6b);
@@ -221,6 +373,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         
         .monthly-result .correct { border-left: 4px solid #4ade80; }
         .monthly-result .incorrect { border-left: 4px solid #ff6b6b; }
+        .monthly-result.closest { border-left: 4px solid #ffb84d; }
         
         .guess-list {
             display: flex;
@@ -237,6 +390,36 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             font-size: 0.9rem;
         }
         
+        .bracket-row { margin-bottom: 18px; }
+        
+        .bracket-label {
+            display: flex;
+            justify-content: space-between;
+            color: #8892b0;
+            font-size: 0.9rem;
+            margin-bottom: 6px;
+        }
+        
+        .bracket-bar {
+            display: flex;
+            height: 26px;
+            border-radius: 8px;
+            overflow: hidden;
+            background: rgba(255,255,255,0.05);
+        }
+        
+        .bracket-bar span {
+            border-right: 1px solid #1a1a2e;
+            background: rgba(247, 147, 26, 0.45);
+            font-size: 0.75rem;
+            line-height: 26px;
+            text-align: center;
+            overflow: hidden;
+            white-space: nowrap;
+        }
+        
+        .bracket-bar span.hit { background: #4ade80; color: #1a1a2e; }
+        
         .yearly-card {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
@@ -257,6 +440,8 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             box-shadow: 0 10px 40px rgba(247, 147, 26, 0.2);
         }
         
+        .participant-card.leading { border-color: #4ade80; }
+        
         .participant-name {
             font-size: 1.2rem;
             font-weight: bold;
@@ -284,6 +469,14 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         
         .empty-state .emoji { font-size: 4rem; margin-bottom: 20px; }
         
+        .screenshot img {
+            display: block;
+            max-width: 320px;
+            width: 100%;
+            border-radius: 12px;
+            margin-bottom: 15px;
+        }
+        
         @media (max-width: 768px) {
             h1 { font-size: 2rem; }
             .card { padding: 20px; }
@@ -302,6 +495,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             <button class="tab active" onclick="showTab('standings')">🏆 Standings</button>
             <button class="tab" onclick="showTab('monthly')">📅 Monthly</button>
             <button class="tab" onclick="showTab('yearly')">🎯 Yearly 2026</button>
+            <button class="tab" onclick="showTab('stats')">📈 Stats</button>
         </div>
         
         <div id="standings" class="section active">
@@ -325,20 +519,42 @@ HTML_TEMPLATE = """<!DOCTYPE html>
                 <p style="color: #8892b0; margin-bottom: 20px;">
                     All registered guesses for 2026. Winner revealed December 31, 2026!
                 </p>
-                <div class="yearly-card">
+                <div class="yearly-card" data-year="2026">
                     CARDS_YEARLY
                 </div>
             </div>
         </div>
         
+        <div id="stats" class="section">
+            <div class="card">
+                <div class="card-header">
+                    <h2 class="card-title">📈 Crowd vs Price</h2>
+                </div>
+                <p style="color: #8892b0; margin-bottom: 20px;">
+                    How the votes split across brackets each month; green is the bracket the price closed in.
+                </p>
+                <div id="bracket-chart"></div>
+            </div>
+            <div class="card">
+                <div class="card-header">
+                    <h2 class="card-title">🎯 Beating the Crowd</h2>
+                </div>
+                <p style="color: #8892b0; margin-bottom: 20px;">
+                    Correct guesses against what the crowd's split gave each pick.
+                </p>
+                <div id="calibration-table"></div>
+            </div>
+        </div>
+        
         <footer class="footer">
             <p>🦞 Built with ⚡ by ClawdPerth</p>
             <p style="font-size: 0.9rem; margin-top: 10px;">
-                All predictions in AUD (Australian Dollars)
+                All predictions in USD (US Dollars)
             </p>
         </footer>
     </div>
     
+    <script type="application/json" id="analytics-data">DATA_ANALYTICS</script>
     <script>
         function showTab(tabId) {
             document.querySelectorAll('.section').forEach(s => s.classList.remove('active'));
@@ -346,24 +562,149 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             document.getElementById(tabId).classList.add('active');
             event.target.classList.add('active');
         }
+
+        // Stats: charts drawn from the analytics tables embedded above
+        function el(tag, className, text) {
+            const node = document.createElement(tag);
+            if (className) node.className = className;
+            if (text !== undefined) node.textContent = text;
+            return node;
+        }
+
+        function drawStats() {
+            const stats = JSON.parse(document.getElementById('analytics-data').textContent);
+            const usd = n => '$' + Math.round(n).toLocaleString();
+            const crowd = new Map(stats.crowd.map(c => [c.month, c]));
+            const chart = document.getElementById('bracket-chart');
+            stats.brackets.slice().reverse().forEach(m => {
+                const row = el('div', 'bracket-row');
+                const label = el('div', 'bracket-label');
+                const c = crowd.get(m.month);
+                label.append(el('span', '', m.label + ' · ' + m.votes + ' votes'),
+                             el('span', '', c ? 'Closed ' + usd(c.price) + ' · crowd ' + (c.modal_correct ? '🎯' : '❌')
+                                             : 'Voting open'));
+                const bar = el('div', 'bracket-bar');
+                m.brackets.forEach(b => {
+                    const part = el('span', b.correct ? 'hit' : '', b.share >= 0.15 ? b.guess : '');
+                    part.style.width = (b.share * 100) + '%';
+                    part.title = b.guess + ': ' + b.votes + ' (' + Math.round(b.share * 100) + '%)';
+                    bar.appendChild(part);
+                });
+                row.append(label, bar);
+                chart.appendChild(row);
+            });
+            if (!stats.players.length) {
+                chart.parentNode.nextElementSibling.style.display = 'none';
+                return;
+            }
+            const table = el('table', 'standings-table');
+            table.innerHTML = '<thead><tr><th>Player</th><th>Hits</th><th>Crowd odds</th><th>vs Crowd</th>' +
+                              '<th>Bias</th></tr></thead><tbody></tbody>';
+            stats.players.forEach(p => {
+                const tr = table.tBodies[0].insertRow();
+                [el('strong', '', p.name), p.hits + '/' + p.votes, Math.round(p.crowd_rate * 100) + '%',
+                 (p.hits_vs_crowd >= 0 ? '+' : '') + p.hits_vs_crowd.toFixed(2),
+                 (p.bias_pct >= 0 ? '+' : '') + p.bias_pct.toFixed(1) + '%'].forEach(value => {
+                    tr.insertCell().append(value);
+                });
+            });
+            document.getElementById('calibration-table').appendChild(table);
+        }
+        drawStats();
     </script>
+    SCRIPT_LIVE
 </body>
 </html>
 """
 
-def generate_standings_table(standings):
-    rows = ""
-    for i, s in enumerate(standings, 1):
-        rank_class = f"rank-{i}" if i <= 3 else ""
-        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-        rows += f"""
-        <tr>
-            <td><span class="rank {rank_class}">{medal}</span></td>
-            <td><strong>{s['name']}</strong></td>
-            <td class="points">{s['points']} pts</td>
-            <td><span class="wins">{s['wins']} correct</span></td>
-        </tr>"""
-    return f"""
+# Only pages the server renders have an /events stream to listen to
+LIVE_SCRIPT = """<script>
+        // Live updates: apply the server's deltas in place instead of reloading
+        function guessTag(vote) {
+            const tag = document.createElement('span');
+            tag.className = 'guess-tag';
+            tag.textContent = vote.name + ': ' + vote.guess;
+            return tag;
+        }
+
+        function addVotes(delta) {
+            if (delta.kind === 'monthly') {
+                const list = document.querySelector('#month-' + delta.key + ' [data-open]');
+                if (!list) return location.reload();
+                delta.votes.forEach(v => list.appendChild(guessTag(v)));
+            } else {
+                const grid = document.querySelector('.yearly-card[data-year="' + delta.key + '"]');
+                if (!grid) return;
+                delta.votes.forEach(v => {
+                    const card = document.createElement('div');
+                    card.className = 'participant-card';
+                    card.innerHTML = '<div class="participant-name"></div><div class="participant-guess"></div>';
+                    card.firstChild.textContent = v.name;
+                    card.lastChild.textContent = v.guess;
+                    grid.appendChild(card);
+                });
+            }
+        }
+
+        function replaceMonth(delta) {
+            const card = document.getElementById('month-' + delta.key);
+            if (card && !delta.html) card.remove();
+            else if (card) card.outerHTML = delta.html;
+            else if (delta.html) document.getElementById('monthly').insertAdjacentHTML('beforeend', delta.html);
+        }
+
+        function patchStandings(delta) {
+            const body = document.querySelector('.standings-table tbody');
+            if (!body) return location.reload();
+            const rows = new Map([...body.rows].map(tr => [tr.dataset.player, tr]));
+            delta.rows.forEach(r => {
+                let tr = rows.get(r.name);
+                if (!tr) {
+                    tr = body.insertRow();
+                    tr.dataset.player = r.name;
+                    tr.innerHTML = '<td><span class="rank"></span></td><td><strong></strong></td>' +
+                                   '<td class="points"></td><td><span class="wins"></span></td>';
+                    tr.querySelector('strong').textContent = r.name;
+                    rows.set(r.name, tr);
+                }
+                tr.querySelector('.points').textContent = r.points + ' pts';
+                tr.querySelector('.wins').textContent = r.wins + ' correct';
+            });
+            const order = delta.order || [...body.rows].map(tr => tr.dataset.player);
+            rows.forEach((tr, name) => { if (!order.includes(name)) tr.remove(); });
+            order.forEach((name, i) => {
+                const tr = rows.get(name);
+                const rank = tr.querySelector('.rank');
+                rank.className = 'rank' + (i < 3 ? ' rank-' + (i + 1) : '');
+                rank.textContent = ['🥇', '🥈', '🥉'][i] || (i + 1) + '.';
+                body.appendChild(tr);
+            });
+        }
+
+        if (window.EventSource) {
+            const live = new EventSource('events');
+            const on = (name, apply) => live.addEventListener(name, e => apply(JSON.parse(e.data)));
+            on('votes', addVotes);
+            on('month', replaceMonth);
+            on('standings', patchStandings);
+            on('reload', () => location.reload());
+        }
+    </script>"""
+
+TEMPLATE_SLOTS = ('TABLE_STANDINGS', 'SECTIONS_MONTHLY', 'CARDS_YEARLY', 'DATA_ANALYTICS', 'SCRIPT_LIVE')
+
+def split_template(template):
+    """Pre-encode the template as static byte segments interleaved with slot names"""
+    parts = re.split(f"({'|'.join(TEMPLATE_SLOTS)})", template)
+    return [part if part in TEMPLATE_SLOTS else part.encode() for part in parts]
+
+TEMPLATE_SEGMENTS = split_template(HTML_TEMPLATE)
+
+def iter_standings_table(standings):
+    if not standings:
+        yield "<p class='empty-state'>No results yet</p>"
+        return
+    yield """
     <table class="standings-table">
         <thead>
             <tr>
@@ -373,78 +714,335 @@ def generate_standings_table(standings):
                 <th>Correct Guesses</th>
             </tr>
         </thead>
-        <tbody>{rows}</tbody>
-    </table>""" if rows else "<p class='empty-state'>No results yet</p>"
+        <tbody>"""
+    for i, s in enumerate(standings, 1):
+        rank_class = f"rank-{i}" if i <= 3 else ""
+        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+        yield f"""
+        <tr data-player="{escape(s['name'])}">
+            <td><span class="rank {rank_class}">{medal}</span></td>
+            <td><strong>{escape(s['name'])}</strong></td>
+            <td class="points">{s['points']} pts</td>
+            <td><span class="wins">{s['wins']} correct</span></td>
+        </tr>"""
+    yield """</tbody>
+    </table>"""
 
-def generate_monthly_sections(data):
-    sections = ""
-    for month_key, month_data in data.get('monthly', {}).items():
-        price = month_data.get('bitcoin_aud_price')
-        if price:
-            results = calculate_monthly(data, month_key, price)
-            correct = [r for r in results if r['correct']]
-            incorrect = [r for r in results if not r['correct']]
-            
-            html = f"""
-            <div class="card">
+def guess_tags(votes):
+    return ''.join(f'<span class="guess-tag">{escape(v.name)}: {escape(v.guess)}</span>' for v in votes)
+
+def iter_monthly_sections(polls, screenshots=True, month_links=False):
+    for month in polls.months.values():
+        yield from iter_month_card(month, screenshots, month_links)
+
+def iter_month_card(month, screenshots=True, month_link=False):
+    """One month's card; a month still open for votes lists the votes so far.
+
+    month_link links the title to the month's own page (build.py's months/<key>.html).
+    """
+    title = escape(month.label)
+    if month_link:
+        title = f'<a href="months/{escape(month.key)}.html">{title}</a>'
+    price = month.usd_price
+    if not price:
+        yield f"""
+            <div class="card" id="month-{escape(month.key)}">
                 <div class="card-header">
-                    <h2 class="card-title">📅 {month_data.get('month', month_key)}</h2>
-                    <span class="price-badge">${price:,.0f} AUD</span>
+                    <h2 class="card-title">📅 {title}</h2>
+                    <div><span class="price-badge">⏳ Voting open</span></div>
+                </div>
+                <div class="monthly-result">
+                    <span>🗳️</span>
+                    <div>
+                        <strong>Votes So Far</strong>
+                        <div class="guess-list" data-open>
+                            {guess_tags(month.votes)}
+                        </div>
+                    </div>
                 </div>
+            </div>"""
+        return
+    points = {r['guess']: r['points'] for r in score_month(month.votes, price, month.key)}
+    correct = [v for v in month.votes if v.range.contains(price)]
+    closest = [v for v in month.votes if points[v.guess] and not v.range.contains(price)]
+    incorrect = [v for v in month.votes if not points[v.guess]]
+    closest_html = f"""
+                <div class="monthly-result closest">
+                    <span>📍</span>
+                    <div>
+                        <strong>Closest Miss</strong>
+                        <div class="guess-list">
+                            {guess_tags(closest)}
+                        </div>
+                    </div>
+                </div>""" if closest else ''
+
+    yield f"""
+            <div class="card" id="month-{escape(month.key)}">
+                <div class="card-header">
+                    <h2 class="card-title">📅 {title}</h2>
+                    {price_badges(month, price)}
+                </div>
+                {screenshot_html(month) if screenshots else ''}
                 <div class="monthly-result correct">
                     <span>🎯</span>
                     <div>
                         <strong>Correct Range</strong>
                         <div class="guess-list">
-                            {''.join(f'<span class="guess-tag">{r["name"]}: {r["guess"]}</span>' for r in correct)}
+                            {guess_tags(correct)}
                         </div>
                     </div>
-                </div>
+                </div>{closest_html}
                 <div class="monthly-result incorrect">
                     <span>❌</span>
                     <div>
                         <strong>Other Guesses</strong>
                         <div class="guess-list">
-                            {''.join(f'<span class="guess-tag">{r["name"]}: {r["guess"]}</span>' for r in incorrect)}
+                            {guess_tags(incorrect)}
                         </div>
                     </div>
                 </div>
             </div>"""
-            sections += html
-    return sections
 
-def generate_yearly_cards(data):
-    yearly = data.get('yearly', {}).get('2026', {})
-    cards = ""
-    for p in yearly.get('participants', []):
-        cards += f"""
-        <div class="participant-card">
-            <div class="participant-name">{p['name']}</div>
-            <div class="participant-guess">{p['guess']}</div>
+def month_card_html(polls, month_key, screenshots=True):
+    month = polls.months.get(month_key)
+    return ''.join(iter_month_card(month, screenshots)) if month else ''
+
+def price_badges(month, price):
+    """USD close, plus AUD from the data or the price cache (never fetched while rendering)"""
+    badges = f'<span class="price-badge">${price:,.0f} USD</span>'
+    aud = month.aud_price or prices.cached_close(month.key, 'aud')
+    if aud:
+        badges += f' <span class="price-badge">A${aud:,.0f} AUD</span>'
+    return f'<div>{badges}</div>'
+
+def screenshot_html(month):
+    entry = images.screenshot_for(month.key)
+    if entry is None:
+        return ''
+    return images.picture_html(entry, escape(f"{month.label} poll"))
+
+def iter_yearly_cards(polls):
+    """Yearly guesses; brackets that would win at the year's price (or the latest close) are highlighted"""
+    yearly = polls.yearly.get('2026')
+    if yearly is None:
+        return
+    price = yearly.usd_price or latest_close(polls.raw)[1]
+    leading = set(YearlyIndex(yearly.votes).winning_brackets(price)) if price else set()
+    for v in yearly.votes:
+        card_class = "participant-card leading" if v.guess in leading else "participant-card"
+        title = f' title="Leading at ${price:,.0f}"' if v.guess in leading else ''
+        yield f"""
+        <div class="{card_class}"{title}>
+            <div class="participant-name">{escape(v.name)}</div>
+            <div class="participant-guess">{escape(v.guess)}</div>
         </div>"""
-    return cards
-
-def generate_html(data):
-    html = HTML_TEMPLATE
-    html = html.replace("TABLE_STANDINGS", generate_standings_table(get_standings(data)))
-    html = html.replace("SECTIONS_MONTHLY", generate_monthly_sections(data))
-    html = html.replace("CARDS_YEARLY", generate_yearly_cards(data))
-    return html
-
-class Handler(SimpleHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/' or self.path == '/index.html':
-            data = load_data()
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(generate_html(data).encode())
+
+def generate_standings_table(standings):
+    return ''.join(iter_standings_table(standings))
+
+def generate_monthly_sections(data):
+    return ''.join(iter_monthly_sections(as_polls(data)))
+
+def generate_yearly_cards(data):
+    return ''.join(iter_yearly_cards(as_polls(data)))
+
+def analytics_json(tables):
+    # '<' is escaped so a name like '</script>' can't end the script element
+    return json.dumps(tables, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+
+def iter_page(data, standings=None, analytics=None, screenshots=True, live_updates=False, month_links=False):
+    """The page as byte chunks: pre-encoded template segments and rendered slots.
+
+    data is a model.Polls, or raw data to validate first. standings and
+    analytics default to the default site's. live_updates adds the script
+    that follows the server's /events stream, month_links links each month
+    card to its static page.
+    """
+    polls = as_polls(data)
+    if standings is None:
+        standings = get_standings(polls)
+    slots = {
+        'TABLE_STANDINGS': lambda: metrics.timed_chunks('standings_table', iter_standings_table(standings)),
+        'SECTIONS_MONTHLY': lambda: metrics.timed_chunks('monthly_sections',
+                                                         iter_monthly_sections(polls, screenshots, month_links)),
+        'CARDS_YEARLY': lambda: metrics.timed_chunks('yearly_cards', iter_yearly_cards(polls)),
+        'DATA_ANALYTICS': lambda: [analytics_json(analytics if analytics is not None else get_analytics(polls))],
+        'SCRIPT_LIVE': lambda: [LIVE_SCRIPT] if live_updates else [],
+    }
+    for segment in TEMPLATE_SEGMENTS:
+        if isinstance(segment, bytes):
+            yield segment
         else:
-            super().do_GET()
+            for chunk in slots[segment]():
+                yield chunk.encode()
 
-if __name__ == "__main__":
+def generate_html(data, standings=None, analytics=None, month_links=False):
+    return b''.join(iter_page(data, standings, analytics, month_links=month_links)).decode()
+
+class Site:
+    """Everything served for one data file: data/polls.json at /, or a group's shard (see groups.py).
+
+    Each site has its own standings, analytics, page and API caches, live
+    updates and, from its first POST, write queue.
+    """
+
+    def __init__(self, data_file, group=None, write_interval=0.05):
+        self.group = group
+        self.data_file = Path(data_file)
+        self.source = open_source(self.data_file)
+        self.standings = StandingsEngine(score_month, score_month.id,
+                                         self.data_file.with_name("polls.standings-app.json"),
+                                         price_key='bitcoin_usd_price')
+        self.analytics = Analytics(price_key='bitcoin_usd_price')
+        self.aliases_file = self.data_file.with_name(ALIASES_FILE.name)
+        # Screenshots are only kept for the original polls
+        self.screenshots = group is None
+        self.pages = RenderCache('page', self.source, self.render_page,
+                                 depends=[images.CACHE_DIR / images.MANIFEST_NAME, prices.PRICES_FILE], stream=True)
+        self.api = RenderCache('api', self.source, self.build_api_index, depends=[self.aliases_file])
+        # Started by the first /events request
+        self.live = live.LiveUpdates(self.source, self.live_standings, self.month_card_html)
+        self.write_interval = write_interval
+        self.writes = None
+        self._writes_lock = threading.Lock()
+
+    def render_page(self, polls, live_updates=True):
+        """iter_page, timed as the template_fill stage"""
+        standings = get_standings(polls, self.standings)
+        return metrics.timed_chunks('template_fill', iter_page(polls, standings, get_analytics(polls, self.analytics),
+                                                               self.screenshots, live_updates))
+
+    def build_api_index(self, polls):
+        with self.standings.lock:
+            standings = get_standings(polls, self.standings)
+            months = dict(self.standings.months)
+        return ApiIndex(polls.raw, standings, months, load_aliases(self.aliases_file),
+                        get_analytics(polls, self.analytics))
+
+    def live_standings(self, polls):
+        return [{'name': s['name'], 'points': s['points'], 'wins': s['wins']}
+                for s in get_standings(polls, self.standings)]
+
+    def month_card_html(self, polls, month_key):
+        return month_card_html(polls, month_key, self.screenshots)
+
+    def write_queue(self):
+        """The site's writes.WriteQueue, started by its first write"""
+        with self._writes_lock:
+            if self.writes is None:
+                import writes
+
+                self.writes = writes.WriteQueue(self.source, self.write_interval,
+                                                on_commit=[self.pages.invalidate, self.api.invalidate])
+            return self.writes
+
+    def memory_key(self):
+        """Changes whenever the site may be holding more memory"""
+        page, api = self.pages._page, self.api._page
+        # The API memoizes responses as they're requested; re-measure every 64 new ones
+        return (page and page.digest, api and api.digest, api and len(api.body._responses) // 64)
+
+    def busy(self):
+        return len(self.live.hub) > 0
+
+    def close(self):
+        if self.writes:
+            self.writes.stop()
+        self.live.stop()
+        model.forget(self.source)
+
+SITE = Site(DATA_FILE)
+DATA_SOURCE, STANDINGS, ANALYTICS = SITE.source, SITE.standings, SITE.analytics
+PAGE_CACHE, API_CACHE, LIVE = SITE.pages, SITE.api, SITE.live
+
+def build_api_index(polls):
+    return SITE.build_api_index(polls)
+
+def render_page(polls):
+    return SITE.render_page(polls)
+
+def live_standings(polls):
+    return SITE.live_standings(polls)
+
+def cache_hit_ratios():
+    ratios = {}
+    for name in ('page', 'api', 'api_response'):
+        lookups = sum(metrics.CACHE_LOOKUPS.value(name, r) for r in ('hit', 'revalidated', 'miss'))
+        if lookups:
+            ratios[(name,)] = (lookups - metrics.CACHE_LOOKUPS.value(name, 'miss')) / lookups
+    info = parse_guess.cache_info()
+    if info.hits + info.misses:
+        ratios[('parse_guess',)] = info.hits / (info.hits + info.misses)
+    return ratios
+
+metrics.REGISTRY.gauge('wabv_cache_hit_ratio', "Share of cache lookups served without re-rendering",
+                       cache_hit_ratios, ['cache'])
+metrics.REGISTRY.gauge('wabv_live_clients', "Connected /events clients", lambda: len(LIVE.hub))
+
+def render_once(out, site=None):
+    """Render the page once for a script or cron job, without starting the server"""
+    import startup
+
+    site = site or SITE
+    _, polls = startup.load_polls(site.data_file)
+    body = b''.join(site.render_page(polls, live_updates=False))
+    if out == '-':
+        sys.stdout.buffer.write(body)
+    else:
+        Path(out).write_bytes(body)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WA Bitcoiners Vote results server")
+    parser.add_argument('--host', default='localhost', help="bind address (default: localhost)")
+    parser.add_argument('--port', type=int, default=8000, help="port (default: 8000)")
+    parser.add_argument('--workers', type=int, default=16,
+                        help="worker threads; 0 runs the single-threaded server (default: 16)")
+    parser.add_argument('--settle-prices', metavar='SOURCE',
+                        help="settle closed months in the background from SOURCE (coingecko or fixture:<path>)")
+    parser.add_argument('--profile-slowest', type=int, metavar='N',
+                        help="profile requests with cProfile and keep dumps of the N slowest")
+    parser.add_argument('--profile-dir', type=Path, default=Path(__file__).parent / ".cache" / "profiles",
+                        help="where --profile-slowest writes .prof files (default: .cache/profiles)")
+    parser.add_argument('--write-interval', type=float, default=50, metavar='MS',
+                        help="how long POSTed writes are held to batch into one commit (default: 50)")
+    parser.add_argument('--render', metavar='PATH',
+                        help="write the page to PATH ('-' for stdout) and exit instead of serving")
+    parser.add_argument('--group', help="with --render, render this group's page instead (see groups.py)")
+    parser.add_argument('--groups-dir', type=Path, default=groups.GROUPS_DIR,
+                        help="where group data lives, one directory per group (default: data/groups)")
+    parser.add_argument('--group-memory', type=float, default=groups.DEFAULT_MAX_BYTES / 2**20, metavar='MB',
+                        help="memory kept for loaded groups before the least recently used are dropped "
+                             f"(default: {groups.DEFAULT_MAX_BYTES // 2**20})")
+    args = parser.parse_args(argv)
+
+    if args.render:
+        site = None
+        if args.group:
+            if not groups.exists(args.group, args.groups_dir):
+                parser.error(f"no group {args.group!r} in {args.groups_dir}")
+            site = Site(groups.data_file(args.group, args.groups_dir), args.group)
+        render_once(args.render, site)
+        return
+
+    import server
+
+    profiler = metrics.SlowestProfiles(args.profile_dir, args.profile_slowest) if args.profile_slowest else None
+    interval = args.write_interval / 1000
+    SITE.write_interval = interval
+    sites = groups.Groups(SITE, lambda group, data_file: Site(data_file, group, interval),
+                          args.groups_dir, int(args.group_memory * 2**20))
+    metrics.REGISTRY.gauge('wabv_group_bytes', "Approximate memory held by each loaded group", sites.sizes, ['group'])
+    metrics.REGISTRY.gauge('wabv_groups_loaded', "Group sites currently loaded", sites.loaded)
+    httpd = server.make_server(sites, args.host, args.port, args.workers, profiler, writes=True)
+    mode = f"{args.workers} workers" if args.workers > 0 else "single-threaded"
     print("🦞 WA Bitcoiners Vote Website")
     print("="*40)
-    print("Server running at http://localhost:8000")
-    server = HTTPServer(('localhost', 8000), Handler)
-    server.serve_forever()
+    print(f"Server running at http://{args.host}:{httpd.server_address[1]} ({mode})", flush=True)
+    if args.settle_prices:
+        prices.start_settler(sites.data_files, prices.make_source(args.settle_prices))
+    server.serve(httpd)
+    print("Server stopped")
+
+if __name__ == "__main__":
+    main()
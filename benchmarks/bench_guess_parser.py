@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: shared guess parser vs the parsers it replaced.
+
+The legacy functions below are copies of the inline parsing that used to
+live in calculate_points.parse_guess and app.calculate_monthly, kept here
+only as a baseline. The workload is every guess in data/polls.json,
+repeated, which mirrors how each poll reuses a few bracket strings.
+
+    python3 benchmarks/bench_guess_parser.py
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import guesses
+
+def legacy_calculate_points_parse(guess):
+    guess = guess.strip()
+    if '-' in guess or '–' in guess:
+        parts = guess.replace('–', '-').split('-')
+        min_str = parts[0].strip().replace('$', '').replace('k', '000').replace('K', '000').strip()
+        max_str = parts[1].strip().replace('$', '').replace('k', '000').replace('K', '000').strip()
+        try:
+            return (float(min_str), float(max_str))
+        except ValueError:
+            pass
+    if '<' in guess:
+        val = guess.replace('<', '').replace('$', '').replace('k', '000').replace('K', '000').strip()
+        try:
+            return (0, float(val))
+        except ValueError:
+            pass
+    if '>' in guess:
+        val = guess.replace('>', '').replace('$', '').replace('k', '000').replace('K', '000').strip()
+        try:
+            return (float(val), float('inf'))
+        except ValueError:
+            pass
+    if 'k' in guess.lower():
+        val = guess.replace('$', '').replace('k', '000').replace('K', '000').strip()
+        try:
+            val = float(val)
+            return (val, val)
+        except ValueError:
+            pass
+    return (None, None)
+
+def legacy_app_in_range(guess, actual_price):
+    if '-' in guess or '–' in guess:
+        parts = guess.replace('–', '-').split('-')
+        try:
+            min_val = float(parts[0].replace('$', '').replace('k', '000').replace('K', '000').strip())
+            max_val = float(parts[1].replace('$', '').replace('k', '000').replace('K', '000').strip())
+            return min_val <= actual_price <= max_val
+        except ValueError:
+            return False
+    elif '<' in guess:
+        val = float(guess.replace('<', '').replace('$', '').replace('k', '000').replace('K', '000').strip())
+        return actual_price < val
+    return False
+
+def workload(repeat):
+    data = json.loads((ROOT / 'data' / 'polls.json').read_text())
+    polls = list(data.get('monthly', {}).values()) + list(data.get('yearly', {}).values())
+    return [p['guess'] for poll in polls for p in poll.get('participants', [])] * repeat
+
+def main():
+    items = workload(100)
+    price = 78_632
+    cases = {
+        'legacy calculate_points.parse_guess': lambda: [legacy_calculate_points_parse(g) for g in items],
+        'legacy app inline parse': lambda: [legacy_app_in_range(g, price) for g in items],
+        'guesses.parse_guess (memoized)': lambda: [guesses.parse_guess(g) for g in items],
+        'guesses.parse_guess (cache cleared)': lambda: (guesses.parse_guess.cache_clear(),
+                                                       [guesses.parse_guess(g) for g in items]),
+    }
+    print(f"{len(items)} guesses per run")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=10, repeat=5)) / 10
+        print(f"  {name:<40} {best * 1e3:8.3f} ms   {best / len(items) * 1e9:8.1f} ns/guess")
+
+if __name__ == "__main__":
+    main()
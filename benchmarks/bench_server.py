@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load-test app.py in single-threaded and thread-pool modes.
+
+Starts each server as a subprocess, hits it with concurrent keep-alive
+clients for a fixed duration and reports requests/sec and latency
+percentiles, plus the worst latency any one client saw (a client starved
+for the whole run shows up there, not in the percentiles). Optional "slow
+clients" open a connection and trickle a request, which is what stalls the
+single-threaded server in production; "idle clients" make one request and
+then hold their keep-alive connection open, like a browser tab.
+
+    python3 benchmarks/bench_server.py --clients 16 --duration 5
+    python3 benchmarks/bench_server.py --workers 4 --idle-clients 4
+"""
+
+import argparse
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PATHS = ['/', '/images/monthly/2026-01.png']
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(port, workers):
+    proc = subprocess.Popen(
+        [sys.executable, 'app.py', '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in proc.stdout:
+        if line.startswith('Server running'):
+            return proc
+    raise RuntimeError("server did not start")
+
+def slow_client(port, stop):
+    """Send one header line at a time, slowly, until told to stop"""
+    try:
+        with socket.create_connection(('127.0.0.1', port)) as s:
+            s.sendall(b'GET / HTTP/1.1\r\n')
+            while not stop.is_set():
+                s.sendall(b'X-Slow: 1\r\n')
+                stop.wait(1)
+    except OSError:
+        pass
+
+def idle_client(port, stop):
+    """One request, then keep the connection open without using it"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', '/')
+        conn.getresponse().read()
+        stop.wait()
+    except (OSError, http.client.HTTPException):
+        pass
+    conn.close()
+
+def client(port, deadline, latencies, errors, worst):
+    """Request until the deadline; the request in flight at the deadline still counts"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    i = 0
+    slowest = 0.0
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            conn.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            conn.close()
+            continue
+        finally:
+            slowest = max(slowest, time.perf_counter() - start)
+        latencies.append(time.perf_counter() - start)
+    worst.append(slowest)
+    conn.close()
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run(workers, clients, duration, slow_clients, idle_clients=0):
+    port = free_port()
+    proc = start_server(port, workers)
+    stop = threading.Event()
+    background = [threading.Thread(target=slow_client, args=(port, stop), daemon=True) for _ in range(slow_clients)]
+    background += [threading.Thread(target=idle_client, args=(port, stop), daemon=True) for _ in range(idle_clients)]
+    latencies, errors, worst = [], [], []
+    try:
+        for t in background:
+            t.start()
+        time.sleep(0.2)
+        deadline = time.perf_counter() + duration
+        threads = [threading.Thread(target=client, args=(port, deadline, latencies, errors, worst))
+                   for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        stop.set()
+        proc.terminate()
+        proc.wait()
+    return {
+        'mode': f"{workers} workers" if workers else "single-threaded",
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / duration,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'worst_ms': max(worst, default=float('nan')) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test app.py serving modes")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--idle-clients', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<18} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'worst ms':>9}")
+    for workers in (0, args.workers):
+        r = run(workers, args.clients, args.duration, args.slow_clients, args.idle_clients)
+        print(f"{r['mode']:<18} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['worst_ms']:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Measure cold start: how long a fresh process takes to import and run.
+
+Each case runs as a new interpreter under `-X importtime` several times.
+Reports the median wall time, the median total import time, and the
+slowest imports, so a module that starts pulling in something heavy
+(NumPy, Pillow, the HTTP server) shows up by name.
+
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --runs 20 --top 10
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CASES = {
+    'import calculate_points': ['-c', 'import calculate_points'],
+    'import app': ['-c', 'import app'],
+    'calculate_points.py --format json': ['calculate_points.py', '--format', 'json'],
+    'app.py --render -': ['app.py', '--render', '-'],
+}
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def run_once(args):
+    """(wall seconds, {module: cumulative us}) for one fresh process"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(args)} exited {proc.returncode}:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            modules[m[4]] = (int(m[2]), len(m[3]))
+    return wall, modules
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold start times for the command-line entry points")
+    parser.add_argument('--runs', type=int, default=10, help="fresh processes per case (default: 10)")
+    parser.add_argument('--top', type=int, default=5, help="slowest imports to list per case (default: 5)")
+    args = parser.parse_args(argv)
+
+    # The first run warms the .pyc and startup caches; it isn't counted
+    for case in CASES.values():
+        run_once(case)
+
+    print(f"{'case':<36} {'wall ms':>9} {'imports ms':>11}")
+    for name, case in CASES.items():
+        walls, imports, slowest = [], [], {}
+        for _ in range(args.runs):
+            wall, modules = run_once(case)
+            walls.append(wall)
+            # Top-level imports carry the cumulative time of everything below them
+            imports.append(sum(us for us, depth in modules.values() if depth == 1))
+            for module, (us, depth) in modules.items():
+                if not (depth == 1 and module in name.split()):
+                    slowest.setdefault(module, []).append(us)
+        print(f"{name:<36} {statistics.median(walls) * 1e3:>9.1f} {statistics.median(imports) / 1e3:>11.1f}")
+        top = sorted(((statistics.median(us), m) for m, us in slowest.items()), reverse=True)[:args.top]
+        for us, module in top:
+            print(f"    {module:<40} {us / 1e3:>7.1f} ms")
+
+if __name__ == "__main__":
+    main()
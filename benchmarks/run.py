@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scoring, standings and rendering hot paths at scale.
+
+Builds synthetic history with benchmarks/synthetic.py, times each case over
+several iterations and writes throughput, latency percentiles and peak
+memory (tracemalloc, measured in a separate run) to a JSON results file.
+
+    python3 benchmarks/run.py --years 5 --players 2000 --votes-per-month 500
+    python3 benchmarks/run.py --only parse_guess,generate_html --output before.json
+"""
+
+import argparse
+import copy
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import app
+import calculate_points
+import columnar
+import guesses
+import model
+from analytics import Analytics
+from standings import StandingsEngine
+from synthetic import generate
+
+def fresh_app_engine():
+    return StandingsEngine(app.score_month, 'bench', price_key=app.STANDINGS.price_key)
+
+def fresh_page_state():
+    # Cold standings and analytics, so every run pays for both aggregations
+    return fresh_app_engine(), Analytics(price_key=app.ANALYTICS.price_key)
+
+def make_cases(data, store_path):
+    """name -> (setup() -> state, run(state), items processed per run)"""
+    months = list(data['monthly'].values())
+    all_guesses = [p['guess'] for m in months for p in m['participants']]
+    votes = len(all_guesses)
+    last_key = list(data['monthly'])[-1]
+    # The server validates each data version once and shares the records
+    polls = model.parse(data)
+
+    def one_month_changed():
+        engine = StandingsEngine(calculate_points.score_month, 'bench')
+        engine.sync(polls)
+        changed = copy.deepcopy(data)
+        changed['monthly'][last_key]['participants'].append({'name': 'Late Voter', 'guess': all_guesses[-1]})
+        return engine, model.parse(changed)
+
+    return {
+        'parse_guess': (lambda: guesses.parse_guess.cache_clear(),
+                        lambda _: [guesses.parse_guess(g) for g in all_guesses], votes),
+        'model_parse': (lambda: None, lambda _: model.parse(data), votes),
+        'calculate_monthly_points': (lambda: None,
+                                     lambda _: [calculate_points.calculate_monthly_points(m['participants'],
+                                                                                          m['bitcoin_usd_price'])
+                                                for m in months], votes),
+        'get_overall_standings': (lambda: None, lambda _: calculate_points.get_overall_standings(polls), votes),
+        'columnar_standings': (lambda: None,
+                               lambda _: calculate_points.get_overall_standings_columnar(
+                                   columnar.ColumnarPolls(store_path)), votes),
+        'standings_engine_one_month': (one_month_changed, lambda s: s[0].sync(s[1]),
+                                       len(data['monthly'][last_key]['participants']) + 1),
+        'get_standings': (fresh_app_engine, lambda engine: app.get_standings(polls, engine), votes),
+        'generate_html': (fresh_page_state,
+                          lambda s: app.generate_html(polls, app.get_standings(polls, s[0]),
+                                                      app.get_analytics(polls, s[1])), votes),
+    }
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def measure(setup, run, items, iterations, warmup=1):
+    for _ in range(warmup):
+        run(setup())
+    timings = []
+    for _ in range(iterations):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        'iterations': iterations,
+        'items': items,
+        'mean_ms': mean * 1e3,
+        'p50_ms': percentile(timings, 50) * 1e3,
+        'p95_ms': percentile(timings, 95) * 1e3,
+        'p99_ms': percentile(timings, 99) * 1e3,
+        'items_per_sec': items / mean if mean else None,
+        'peak_memory_bytes': peak,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WA Bitcoiners Vote hot paths")
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--votes-per-month', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', help="comma-separated case names")
+    parser.add_argument('--output', type=Path, default=Path(__file__).parent / "results.json")
+    args = parser.parse_args()
+
+    data = generate(args.years, args.players, args.votes_per_month, args.seed)
+    # Removed when the process exits
+    store_dir = tempfile.TemporaryDirectory()
+    store_path = Path(store_dir.name) / "polls.col"
+    columnar.write(data, store_path)
+    cases = make_cases(data, store_path)
+    if args.only:
+        wanted = args.only.split(',')
+        unknown = set(wanted) - set(cases)
+        if unknown:
+            parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+        cases = {name: cases[name] for name in wanted}
+
+    results = {}
+    print(f"{len(data['monthly'])} months, {args.players} players, {args.votes_per_month} votes/month")
+    print(f"{'case':<28} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10} {'items/s':>12} {'peak KiB':>10}")
+    for name, (setup, run, items) in cases.items():
+        r = measure(setup, run, items, args.iterations)
+        results[name] = r
+        print(f"{name:<28} {r['mean_ms']:>10.2f} {r['p50_ms']:>10.2f} {r['p99_ms']:>10.2f} "
+              f"{r['items_per_sec']:>12,.0f} {r['peak_memory_bytes'] / 1024:>10,.0f}")
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'years': args.years, 'players': args.players, 'votes_per_month': args.votes_per_month,
+                   'iterations': args.iterations, 'seed': args.seed},
+        'results': results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + '\n')
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Synthetic poll history for benchmarks.
+
+Generates polls.json-shaped data with years of monthly polls and a large
+player pool. Each month offers four or five brackets around a random-walk
+price, written the way real polls are ("< $90k", "$90k - $100k", "> $120k"),
+and players pick brackets near the previous close with some noise.
+"""
+
+import random
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+AUD_PER_USD = 1.52
+
+def brackets_around(price: float, rng: random.Random) -> list:
+    step = rng.choice([10, 15, 20])
+    centre = round(price / 1000 / step) * step
+    edges = [centre + step * i for i in range(-1, rng.choice([2, 3]))]
+    edges = [e for e in edges if e > 0] or [step]
+    guesses = [f"< ${edges[0]}k"]
+    guesses += [f"${lo}k - ${hi}k" for lo, hi in zip(edges, edges[1:])]
+    guesses.append(f"> ${edges[-1]}k")
+    return guesses
+
+def generate(years: int = 5, players: int = 2000, votes_per_month: int = 500, seed: int = 1,
+             start_year: int = 2020) -> dict:
+    rng = random.Random(seed)
+    names = [f"Player {i}" for i in range(players)]
+    price = 40_000.0
+    monthly = {}
+    for m in range(years * 12):
+        year, month = start_year + m // 12, m % 12
+        brackets = brackets_around(price, rng)
+        voters = rng.sample(names, min(votes_per_month, players))
+        previous, price = price, max(5_000.0, price * rng.lognormvariate(0, 0.12))
+        favourite = min(range(len(brackets)), key=lambda i: abs(i - len(brackets) / 2))
+        participants = []
+        for name in voters:
+            i = min(len(brackets) - 1, max(0, favourite + round(rng.gauss(0, 1))))
+            participants.append({'name': name, 'guess': brackets[i]})
+        monthly[f"{year}-{month + 1:02d}"] = {
+            'month': f"{MONTH_NAMES[month]} {year}",
+            'bitcoin_usd_price': round(price),
+            'bitcoin_aud_price': round(price * AUD_PER_USD),
+            'participants': participants,
+            'notes': f"Opened near ${previous:,.0f} USD.",
+        }
+    yearly = {}
+    for y in range(years):
+        guesses = brackets_around(price * 1.5, rng)
+        yearly[str(start_year + y)] = {
+            'year': start_year + y,
+            'bitcoin_usd_price': None,
+            'participants': [{'name': name, 'guess': rng.choice(guesses)}
+                             for name in rng.sample(names, min(votes_per_month, players))],
+        }
+    return {'monthly': monthly, 'yearly': yearly}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Static Site Build
+
+Renders the results site from the poll data into plain files, using the same
+generators as app.py:
+
+    site/index.html              overall results page
+    site/months/<key>.html       one page per month
+    site/images/..., CNAME, ...  copied static assets
+    site/img/<hash>.<ext>        screenshot variants from images.py
+    *.gz / *.br                  precompressed variants of text files
+
+Builds are incremental: each output records a hash of its inputs (data plus
+renderer source for rendered pages, file bytes for assets) in
+site/.build-manifest.json, and is only rewritten when that hash changes.
+
+Usage:
+    python3 build.py [--out site] [--force]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import app
+import images
+import prices
+from analytics import Analytics
+from poll_log import open_source
+from standings import StandingsEngine
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).parent
+OUT_DIR = ROOT / "site"
+MANIFEST = ".build-manifest.json"
+# This file and every repo module it imports, since any of them can change the rendered pages
+RENDER_SOURCES = app.render_sources(Path(__file__).resolve())
+STATIC_FILES = ['CNAME', 'admin.html']
+STATIC_DIRS = ['images']
+COMPRESSIBLE = {'.html', '.json', '.css', '.js', '.svg', '.txt'}
+
+def digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+def render_month_page(data: dict, month_key: str) -> str:
+    """Results page limited to one month, with that month's standings and stats"""
+    month_only = {**data, 'monthly': {month_key: data['monthly'][month_key]}}
+    engine = StandingsEngine(app.score_month, app.score_month.id, price_key=app.STANDINGS.price_key)
+    analytics = Analytics(price_key=app.ANALYTICS.price_key)
+    return app.generate_html(month_only, app.get_standings(month_only, engine),
+                             app.get_analytics(month_only, analytics))
+
+def planned_outputs(data: dict) -> dict:
+    """Map output path -> (input hash, function producing the bytes)"""
+    source = b''.join(f.read_bytes() for f in RENDER_SOURCES)
+    source += json.dumps(images.load_manifest(), sort_keys=True).encode()
+    source += json.dumps(prices.PriceCache().series(), sort_keys=True).encode()
+    outputs = {
+        'index.html': (digest(source, data), lambda: app.generate_html(data, month_links=True).encode()),
+        'data/polls.json': (digest(data), lambda: json.dumps(data, indent=2, ensure_ascii=False).encode()),
+    }
+    for key, month in data.get('monthly', {}).items():
+        outputs[f'months/{key}.html'] = (
+            digest(source, month, data.get('yearly', {})),
+            lambda key=key: render_month_page(data, key).encode())
+    static = [ROOT / f for f in STATIC_FILES if (ROOT / f).is_file()]
+    for d in STATIC_DIRS:
+        static += sorted(p for p in (ROOT / d).rglob('*') if p.is_file())
+    for path in static:
+        raw = path.read_bytes()
+        outputs[path.relative_to(ROOT).as_posix()] = (digest(raw), lambda raw=raw: raw)
+    for entry in images.load_manifest()['images'].values():
+        names = [entry['original'], *entry['full'].values()]
+        names += [name for thumbs in entry['thumbs'].values() for name in thumbs.values()]
+        for name in names:
+            # Content-addressed: the name is the hash
+            outputs[f'img/{name}'] = (name, lambda name=name: (images.CACHE_DIR / name).read_bytes())
+    return outputs
+
+def write_output(out_dir: Path, rel: str, body: bytes) -> list:
+    """Write one output plus its precompressed variants; returns the paths written"""
+    target = out_dir / rel
+    target.parent.mkdir(parents=True, exist_ok=True)
+    variants = {rel: body}
+    if target.suffix in COMPRESSIBLE:
+        variants[rel + '.gz'] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            variants[rel + '.br'] = brotli.compress(body, quality=11)
+    for name, content in variants.items():
+        tmp = out_dir / (name + '.tmp')
+        tmp.write_bytes(content)
+        os.replace(tmp, out_dir / name)
+    return list(variants)
+
+def build(out_dir: Path = OUT_DIR, force: bool = False) -> dict:
+    """Build the site; returns counts of written, unchanged and removed outputs"""
+    data = open_source(app.DATA_FILE).read()[1]
+    manifest_path = out_dir / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    new_manifest = {}
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0}
+    for rel, (input_hash, produce) in planned_outputs(data).items():
+        entry = manifest.get(rel)
+        if not force and entry and entry['hash'] == input_hash and all((out_dir / f).exists() for f in entry['files']):
+            new_manifest[rel] = entry
+            stats['unchanged'] += 1
+            continue
+        new_manifest[rel] = {'hash': input_hash, 'files': write_output(out_dir, rel, produce())}
+        stats['written'] += 1
+
+    for rel, entry in manifest.items():
+        if rel not in new_manifest:
+            for f in entry['files']:
+                (out_dir / f).unlink(missing_ok=True)
+            stats['removed'] += 1
+    manifest_path.write_text(json.dumps(new_manifest, indent=2, sort_keys=True))
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static WA Bitcoiners Vote site")
+    parser.add_argument('--out', type=Path, default=OUT_DIR, help="output directory (default: site/)")
+    parser.add_argument('--force', action='store_true', help="rewrite every output")
+    args = parser.parse_args(argv)
+    stats = build(args.out, args.force)
+    print(f"🦞 Built {args.out}: {stats['written']} written, {stats['unchanged']} unchanged, "
+          f"{stats['removed']} removed" + ("" if brotli else " (brotli not installed, .br skipped)"))
+
+if __name__ == "__main__":
+    main()
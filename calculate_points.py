@@ -2,150 +2,334 @@
 """
 WA Bitcoiners Vote - Point Calculator (USD)
 
-Scoring System:
+Scoring System (rules.RULES['standard']):
 - 3 points for correct price range (actual price falls within their guessed range)
 - 1 point for next closest range
+
+Usage:
+    python3 calculate_points.py                          # data/polls.json as a table
+    python3 calculate_points.py --months 2026-01:2026-06 --currency aud
+    python3 calculate_points.py a/polls.json b/polls.json --format csv --workers 4
 """
 
+import argparse
+import csv
 import json
+import sys
 from pathlib import Path
 
+import guesses
+import model
+import startup
+from model import as_polls, as_votes
+from rules import RULES, get_scorer
+from scoring import group_by_bracket
+from standings import StandingsEngine
+from yearly import YearlyIndex
+
 DATA_FILE = Path(__file__).parent / "data" / "polls.json"
+score_month = get_scorer('standard')
+score_correct_only = get_scorer('correct-only')
 
 def parse_guess(guess: str) -> tuple:
     """Parse a guess string into numeric range"""
-    guess = guess.strip()
-    
-    if '-' in guess or '–' in guess:
-        parts = guess.replace('–', '-').split('-')
-        min_str = parts[0].strip().replace('$', '').replace('k', '000').replace('K', '000').strip()
-        max_str = parts[1].strip().replace('$', '').replace('k', '000').replace('K', '000').strip()
-        try:
-            return (float(min_str), float(max_str))
-        except:
-            pass
-    
-    if '<' in guess:
-        val = guess.replace('<', '').replace('$', '').replace('k', '000').replace('K', '000').strip()
-        try:
-            return (0, float(val))
-        except:
-            pass
-
-    if '>' in guess:
-        val = guess.replace('>', '').replace('$', '').replace('k', '000').replace('K', '000').strip()
-        try:
-            return (float(val), float('inf'))
-        except:
-            pass
-    
-    if 'k' in guess.lower():
-        val = guess.replace('$', '').replace('k', '000').replace('K', '000').strip()
-        try:
-            val = float(val)
-            return (val, val)
-        except:
-            pass
-    
-    return (None, None)
+    parsed = guesses.parse_guess(guess)
+    if parsed is None:
+        return (None, None)
+    return (parsed.min, parsed.max)
 
 def is_in_range(price: float, range_min: float, range_max: float) -> bool:
     if range_min is None or range_max is None:
         return False
     return range_min <= price <= range_max
 
-def calculate_monthly_points(participants: list, actual_price: float) -> dict:
-    parsed = []
-    for p in participants:
-        guess_min, guess_max = parse_guess(p.get('guess', ''))
-        parsed.append({
-            'name': p['name'],
-            'guess': p.get('guess', ''),
-            'guess_min': guess_min,
-            'guess_max': guess_max,
-            'points': 0
-        })
-    
-    correct = [p for p in parsed if is_in_range(actual_price, p['guess_min'], p['guess_max'])]
-    
-    if correct:
-        for p in correct:
-            p['points'] = 3
-        correct_range = f"${correct[0]['guess_min']:,.0f} - ${correct[0]['guess_max']:,.0f}"
-    else:
-        correct = []
-        closest_diff = float('inf')
-        for p in parsed:
-            if actual_price < p['guess_min']:
-                diff = p['guess_min'] - actual_price
-            elif actual_price > p['guess_max']:
-                diff = actual_price - p['guess_max']
-            else:
-                diff = 0
-            if diff < closest_diff:
-                closest_diff = diff
-                correct = [p]
-            elif diff == closest_diff:
-                correct.append(p)
-        for p in correct:
-            p['points'] = 3
-        if correct:
-            correct_range = f"${correct[0]['guess_min']:,.0f} - ${correct[0]['guess_max']:,.0f}"
-        else:
-            correct_range = "N/A"
-    
+def calculate_monthly_points(participants, actual_price: float, scorer=score_month) -> dict:
+    """participants may be dicts from polls.json or model.Vote records"""
+    result = calculate_monthly_points_grid(participants, [actual_price], scorer)[0]
     return {
         'actual_price': actual_price,
-        'correct_range': correct_range,
-        'participants': sorted(parsed, key=lambda x: -x['points'])
+        'correct_range': result['correct_range'],
+        'participants': result['participants'],
     }
 
-def get_overall_standings(data: dict) -> list:
+def calculate_monthly_points_grid(participants: list, prices: list, scorer=score_month, month_key=None) -> list:
+    """Score one month against many candidate closing prices at once.
+
+    Each distinct bracket is scored once per price, then its points are
+    spread to everyone who picked it.
+    """
+    votes = as_votes(participants)
+    groups = group_by_bracket(votes)
+    ranges = [votes[indexes[0]].range for indexes in groups.values()]
+    grid = scorer.grid(ranges, prices, month_key)
+    results = []
+    for price, bracket_points in zip(prices, grid):
+        parsed = []
+        for v in votes:
+            r = v.range
+            parsed.append({
+                'name': v.name,
+                'guess': v.guess,
+                'guess_min': r.min if r is not None else None,
+                'guess_max': r.max if r is not None else None,
+                'points': 0
+            })
+        for (guess, indexes), points in zip(groups.items(), bracket_points):
+            for i in indexes:
+                parsed[i]['points'] = points
+        winner = next((p for p in parsed if is_in_range(price, p['guess_min'], p['guess_max'])), None)
+        if winner:
+            correct_range = f"${winner['guess_min']:,.0f} - ${winner['guess_max']:,.0f}"
+        else:
+            correct_range = "N/A"
+        results.append({
+            'actual_price': price,
+            'correct_range': correct_range,
+            'participants': sorted(parsed, key=lambda x: -x['points'])
+        })
+    return results
+
+def get_overall_standings(data, snapshot_path: Path = None) -> list:
+    """Overall standings for raw data or model.Polls; with snapshot_path only months changed
+    since the snapshot are re-scored"""
+    polls = as_polls(data)
+    if snapshot_path is not None:
+        engine = StandingsEngine(score_month, score_month.id, snapshot_path)
+        engine.sync(polls)
+        return [{'name': p['name'], 'total_points': p['points'], 'correct_guesses': p['wins']}
+                for p in engine.standings()]
+    return _standings(polls.months.values())
+
+def _standings(months) -> list:
     standings = {}
-    for month, month_data in data.get('monthly', {}).items():
-        price = month_data.get('bitcoin_usd_price')
-        if price:
-            result = calculate_monthly_points(month_data.get('participants', []), price)
-            for p in result['participants']:
+    for month in months:
+        if month.usd_price:
+            for p in score_month(month.votes, month.usd_price, month.key):
                 if p['name'] not in standings:
                     standings[p['name']] = {'name': p['name'], 'total_points': 0, 'correct_guesses': 0}
                 standings[p['name']]['total_points'] += p['points']
-                if p['points'] == 3:
+                if p['correct']:
                     standings[p['name']]['correct_guesses'] += 1
     return sorted(standings.values(), key=lambda x: (-x['total_points'], -x['correct_guesses']))
 
-if __name__ == "__main__":
-    data = json.loads(DATA_FILE.read_text())
-    
-    print("="*60)
-    print("🦞 WA BITCOINER VOTE - RESULTS (USD)")
-    print("="*60)
-    
-    print("\n📅 DECEMBER 2025")
-    print("-"*40)
-    dec = data['monthly']['2025-12']
-    if dec.get('bitcoin_usd_price'):
-        result = calculate_monthly_points(dec['participants'], dec['bitcoin_usd_price'])
-        print(f"Bitcoin USD Price: ${result['actual_price']:,.0f}")
-        print(f"Correct Range: {result['correct_range']}")
-        print(f"\nParticipants:")
-        for p in result['participants']:
-            emoji = "🎯" if p['points'] == 3 else "  "
-            print(f"  {emoji} {p['name']}: {p['guess']} - {p['points']} pts")
-    
-    print("\n" + "="*60)
-    print("📊 MONTHLY STANDINGS")
-    print("-"*40)
-    standings = get_overall_standings(data)
-    for i, s in enumerate(standings, 1):
+def get_overall_standings_columnar(store) -> list:
+    """get_overall_standings read straight from a columnar.ColumnarPolls store.
+
+    Works on the integer columns: each bracket is parsed once for the whole
+    history and scored once per month, and points are totalled per player
+    id, so no per-vote dicts are built.
+    """
+    ranges = {}
+    totals = {}
+    for key, month, player_ids, bracket_ids in store.monthly():
+        price = month.get('bitcoin_usd_price')
+        if not price:
+            continue
+        month_brackets = list(dict.fromkeys(bracket_ids))
+        for b in month_brackets:
+            if b not in ranges:
+                ranges[b] = guesses.parse_guess(store.brackets[b])
+        points = dict(zip(month_brackets, score_month.bracket_points([ranges[b] for b in month_brackets], price, key)))
+        # Same first-seen order as the dict version, where each month's results are sorted by points
+        for level in sorted(set(points.values()), reverse=True):
+            for player, bracket in zip(player_ids, bracket_ids):
+                if points[bracket] == level:
+                    total = totals.setdefault(player, [0, 0])
+                    total[0] += level
+                    total[1] += ranges[bracket] is not None and ranges[bracket].contains(price)
+    standings = [{'name': store.players[player], 'total_points': points, 'correct_guesses': correct}
+                 for player, (points, correct) in totals.items()]
+    return sorted(standings, key=lambda x: (-x['total_points'], -x['correct_guesses']))
+
+def what_if_standings(data: dict, month_key: str, prices: list) -> list:
+    """Overall standings for each candidate closing price of one month.
+
+    Returns (price, standings) pairs; every other month is scored as settled.
+    """
+    polls = as_polls(data)
+    base = _standings(m for k, m in polls.months.items() if k != month_key)
+    results = []
+    grid = calculate_monthly_points_grid(polls.months[month_key].votes, prices, month_key=month_key)
+    for price, month in zip(prices, grid):
+        totals = {s['name']: dict(s) for s in base}
+        for p in month['participants']:
+            s = totals.setdefault(p['name'], {'name': p['name'], 'total_points': 0, 'correct_guesses': 0})
+            s['total_points'] += p['points']
+            if is_in_range(price, p['guess_min'], p['guess_max']):
+                s['correct_guesses'] += 1
+        results.append((price, sorted(totals.values(), key=lambda x: (-x['total_points'], -x['correct_guesses']))))
+    return results
+
+CURRENCIES = ('usd', 'aud')
+CSV_FIELDS = ['file', 'month', 'price', 'name', 'guess', 'points', 'correct']
+
+def in_months(key: str, months: str) -> bool:
+    """Whether a month key falls in a 'START:END' range (either end optional) or equals a single key"""
+    if not months:
+        return True
+    start, sep, end = months.partition(':')
+    if not sep:
+        return key == start
+    return (not start or key >= start) and (not end or key <= end)
+
+def standings_file(path: Path, currency: str, rule: str) -> Path:
+    """Where score_file keeps a data file's standings snapshot for one currency and rule"""
+    return path.with_name(f"{path.stem}.standings-{currency}-{rule}.json")
+
+def score_file(path: str, months: str = None, currency: str = 'usd', rule: str = 'standard') -> dict:
+    """Score one polls.json (or its poll log); runs in a worker process.
+
+    Months without a closing price in the currency fall back to the price
+    cache next to the file, and are skipped if it has none either. Without
+    a months filter the standings are kept in a snapshot beside the file
+    (see standings_file), so a re-run only re-scores months that changed.
+    """
+    from prices import PRICES_FILE, PriceCache
+
+    path = Path(path)
+    try:
+        polls = startup.load_polls(path)[1]
+    except (OSError, ValueError) as e:
+        return {'file': str(path), 'error': str(e)}
+    cache = PriceCache(path.with_name(PRICES_FILE.name))
+    price_key = f"bitcoin_{currency}_price"
+    scorer = get_scorer(rule)
+    snapshot = None if months else standings_file(path, currency, scorer.name)
+    engine = StandingsEngine(scorer, scorer.id, snapshot, price_key=price_key)
+    selected = {}
+    for key, month in polls.months.items():
+        if not in_months(key, months):
+            continue
+        if month.price(price_key) is None:
+            close = cache.close(key, currency)
+            # The cached close is part of what was scored, so a new one re-scores the month
+            month = month._replace(**{model.PRICE_ATTRS[price_key]: close},
+                                   fingerprint=f"{month.fingerprint}:{close}")
+        selected[key] = month
+    try:
+        engine.sync(polls._replace(months=selected))
+    except OSError as e:
+        # The scores are complete; only the snapshot couldn't be written
+        print(f"⚠️  {snapshot}: {e}", file=sys.stderr)
+    scored = []
+    for key in selected:
+        entry = engine.months[key]
+        if not entry['price']:
+            continue
+        scored.append({'month': key, 'label': entry['label'], 'price': entry['price'],
+                       'results': [{k: r[k] for k in ('name', 'guess', 'points', 'correct')}
+                                   for r in entry['results']]})
+    standings = [{'name': p['name'], 'total_points': p['points'], 'correct_guesses': p['wins']}
+                 for p in engine.standings()]
+    # Yearly brackets are scored against the latest close in the selected months
+    latest = scored[-1] if scored else None
+    yearly = [{'year': key, 'votes': [{'name': v.name, 'guess': v.guess} for v in poll.votes],
+               'leaders': YearlyIndex(poll.votes).winners_at(latest['price']) if latest else [],
+               'at': latest and {'month': latest['label'], 'price': latest['price']}}
+              for key, poll in polls.yearly.items()]
+    return {'file': str(path), 'currency': currency, 'rule': rule, 'months': scored, 'standings': standings,
+            'yearly': yearly}
+
+def iter_scored(paths: list, months: str, currency: str, rule: str, workers: int):
+    """Yield score_file results as they finish; several files go to a process pool"""
+    if len(paths) == 1 or workers == 1:
+        for path in paths:
+            yield score_file(path, months, currency, rule)
+        return
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers or None) as pool:
+        futures = [pool.submit(score_file, path, months, currency, rule) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+def write_table(result: dict, out):
+    symbol = {'usd': '$', 'aud': 'A$'}[result['currency']]
+    print("=" * 60, file=out)
+    print(f"🦞 {result['file']} - RESULTS ({result['currency'].upper()}, {result['rule']})", file=out)
+    print("=" * 60, file=out)
+    for month in result['months']:
+        print(f"\n📅 {month['label'].upper()} - {symbol}{month['price']:,.0f}", file=out)
+        for r in month['results']:
+            emoji = "🎯" if r['correct'] else "📍" if r['points'] else "  "
+            print(f"  {emoji} {r['name']}: {r['guess']} - {r['points']} pts", file=out)
+    print("\n📊 STANDINGS", file=out)
+    for i, s in enumerate(result['standings'], 1):
         medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "  "
-        print(f"  {medal} {i}. {s['name']}: {s['total_points']} pts ({s['correct_guesses']} correct)")
-    
-    print("\n" + "="*60)
-    print("🎯 YEARLY 2026 PREDICTIONS (USD)")
-    print("-"*40)
-    yearly = data['yearly']['2026']
-    for p in yearly['participants']:
-        print(f"  📌 {p['name']}: {p['guess']}")
-    
-    print("\n" + "="*60)
+        print(f"  {medal} {i}. {s['name']}: {s['total_points']} pts ({s['correct_guesses']} correct)", file=out)
+    for poll in result['yearly']:
+        print(f"\n🎯 YEARLY {poll['year']} PREDICTIONS", file=out)
+        for v in poll['votes']:
+            print(f"  📌 {v['name']}: {v['guess']}", file=out)
+        if poll['at']:
+            print(f"  Leading at the {poll['at']['month']} close ({symbol}{poll['at']['price']:,.0f}): "
+                  f"{', '.join(poll['leaders']) or 'nobody'}", file=out)
+    print(file=out)
+
+def write_csv(result: dict, writer):
+    for month in result['months']:
+        for r in month['results']:
+            writer.writerow({'file': result['file'], 'month': month['month'], 'price': month['price'], **r})
+    for s in result['standings']:
+        writer.writerow({'file': result['file'], 'month': 'overall', 'price': '', 'name': s['name'], 'guess': '',
+                         'points': s['total_points'], 'correct': s['correct_guesses']})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score WA Bitcoiners Vote polls for one or more data files",
+        epilog="Results are written per file as each one finishes, so with several files "
+               "the output order can differ from the argument order.")
+    parser.add_argument('files', nargs='*', type=Path,
+                        help="polls.json files (default: data/polls.json, unless --group is given)")
+    parser.add_argument('--group', action='append', default=[], metavar='NAME',
+                        help="also score a group's data (see groups.py); repeatable")
+    parser.add_argument('--months', metavar='START:END',
+                        help="month range, e.g. 2025-12:2026-03, 2026-01: or a single 2026-02 (default: all)")
+    parser.add_argument('--currency', choices=CURRENCIES, default='usd',
+                        help="closing price the brackets are scored against (default: usd)")
+    parser.add_argument('--rule', default='standard',
+                        help=f"scoring rule: {', '.join(RULES)} or a .json rule file (default: standard)")
+    parser.add_argument('--format', choices=('table', 'json', 'csv'), default='table',
+                        help="table, JSON lines (one object per file) or CSV (default: table)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes for several files (default: one per CPU)")
+    args = parser.parse_args(argv)
+    try:
+        get_scorer(args.rule)
+    except ValueError as e:
+        parser.error(str(e))
+    files = list(args.files)
+    if args.group:
+        import groups
+
+        for name in args.group:
+            if not groups.exists(name):
+                parser.error(f"no group {name!r} in {groups.GROUPS_DIR}")
+            files.append(groups.data_file(name))
+    files = files or [DATA_FILE]
+
+    out = sys.stdout
+    writer = None
+    if args.format == 'csv':
+        writer = csv.DictWriter(out, CSV_FIELDS)
+        writer.writeheader()
+    failed = False
+    for result in iter_scored([str(f) for f in files], args.months, args.currency, args.rule, args.workers):
+        if 'error' in result:
+            failed = True
+            print(f"❌ {result['file']}: {result['error']}", file=sys.stderr)
+            continue
+        if not result['months']:
+            print(f"⚠️  {result['file']}: no months with a {args.currency.upper()} close to score", file=sys.stderr)
+        if args.format == 'json':
+            print(json.dumps(result, ensure_ascii=False), file=out)
+        elif args.format == 'csv':
+            write_csv(result, writer)
+        else:
+            write_table(result, out)
+        out.flush()
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
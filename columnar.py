@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Columnar Poll Store
+
+A compact binary form of polls.json. Player names and guess brackets are
+interned to integer ids, and every vote becomes one row of three uint32
+columns, (poll_id, player_id, bracket_id), in poll order. The file is
+memory-mapped when read, so opening it parses only a small JSON header and
+the columns are used in place.
+
+Layout (little-endian):
+
+    b'WABVCOL1'
+    u32 header_len, u32 polls, u32 votes, u32 reserved
+    header JSON: strings tables, poll list, and the rest of polls.json
+                 with each participants list replaced by {"$votes": poll_id}
+    padding to a 4-byte boundary
+    u32[polls + 1] poll offsets into the vote columns
+    u32[votes] poll_id
+    u32[votes] player_id
+    u32[votes] bracket_id
+
+Conversion is lossless both ways: key order and any extra fields are kept.
+
+Usage:
+    python3 columnar.py build              # data/polls.json -> data/polls.col
+    python3 columnar.py export out.json    # data/polls.col -> JSON
+    python3 columnar.py check              # verify the round trip
+"""
+
+import argparse
+import copy
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from poll_log import open_source, write_atomic
+
+DATA_FILE = Path(__file__).parent / "data" / "polls.json"
+COLUMNAR_FILE = DATA_FILE.with_name("polls.col")
+MAGIC = b'WABVCOL1'
+HEADER = struct.Struct('<4I')
+POLL_KINDS = ('monthly', 'yearly')
+
+def _column(values) -> bytes:
+    column = array('I', values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+def encode(data: dict) -> bytes:
+    """polls.json-shaped data -> columnar file bytes"""
+    players, brackets, polls = {}, {}, []
+    offsets, poll_ids, player_ids, bracket_ids = [0], [], [], []
+    extras = {}
+    skeleton = copy.deepcopy(data)
+    for kind in POLL_KINDS:
+        for key, poll in skeleton.get(kind, {}).items():
+            if 'participants' not in poll:
+                continue
+            poll_id = len(polls)
+            for p in poll['participants']:
+                if list(p) != ['name', 'guess']:
+                    # Votes with extra or missing fields are kept verbatim
+                    extras[str(len(player_ids))] = p
+                player_ids.append(players.setdefault(p.get('name', ''), len(players)))
+                bracket_ids.append(brackets.setdefault(p.get('guess', ''), len(brackets)))
+                poll_ids.append(poll_id)
+            poll['participants'] = {'$votes': poll_id}
+            polls.append([kind, key])
+            offsets.append(len(player_ids))
+
+    header = json.dumps({'players': list(players), 'brackets': list(brackets), 'polls': polls,
+                         'extras': extras, 'data': skeleton}, ensure_ascii=False).encode()
+    header += b'\0' * (-(len(MAGIC) + HEADER.size + len(header)) % 4)
+    return b''.join([MAGIC, HEADER.pack(len(header), len(polls), len(player_ids), 0), header,
+                     _column(offsets), _column(poll_ids), _column(player_ids), _column(bracket_ids)])
+
+class ColumnarPolls:
+    """A memory-mapped columnar poll file"""
+
+    def __init__(self, path: Path = COLUMNAR_FILE):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a columnar poll file")
+        start = len(MAGIC) + HEADER.size
+        header_len, n_polls, n_votes, _ = HEADER.unpack_from(self._map, len(MAGIC))
+        header = json.loads(self._map[start:start + header_len].rstrip(b'\0'))
+        self.players = header['players']
+        self.brackets = header['brackets']
+        self.polls = [tuple(p) for p in header['polls']]
+        self.poll_index = {p: i for i, p in enumerate(self.polls)}
+        self._extras = header['extras']
+        self._skeleton = header['data']
+
+        start += header_len
+        self.offsets, start = self._view(start, n_polls + 1), start + 4 * (n_polls + 1)
+        self.poll_ids, start = self._view(start, n_votes), start + 4 * n_votes
+        self.player_ids, start = self._view(start, n_votes), start + 4 * n_votes
+        self.bracket_ids = self._view(start, n_votes)
+
+    def _view(self, start: int, count: int):
+        view = memoryview(self._map)[start:start + 4 * count]
+        if sys.byteorder == 'big':
+            column = array('I', view)
+            column.byteswap()
+            return column
+        return view.cast('I')
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def poll(self, kind: str, key: str) -> dict:
+        """A poll's fields, without its participants"""
+        return {k: v for k, v in self._skeleton[kind][key].items() if k != 'participants'}
+
+    def votes(self, kind: str, key: str):
+        """(player_ids, bracket_ids) column slices for one poll"""
+        poll_id = self.poll_index[(kind, key)]
+        lo, hi = self.offsets[poll_id], self.offsets[poll_id + 1]
+        return self.player_ids[lo:hi], self.bracket_ids[lo:hi]
+
+    def monthly(self):
+        """(key, poll fields, player_ids, bracket_ids) for each month in order"""
+        for key in self._skeleton.get('monthly', {}):
+            if ('monthly', key) in self.poll_index:
+                yield (key, self.poll('monthly', key)) + tuple(self.votes('monthly', key))
+
+    def to_data(self) -> dict:
+        """The original polls.json data"""
+        data = copy.deepcopy(self._skeleton)
+        for poll_id, (kind, key) in enumerate(self.polls):
+            lo, hi = self.offsets[poll_id], self.offsets[poll_id + 1]
+            data[kind][key]['participants'] = [self._vote(i) for i in range(lo, hi)]
+        return data
+
+    def _vote(self, i: int) -> dict:
+        extra = self._extras.get(str(i))
+        if extra is not None:
+            return extra
+        return {'name': self.players[self.player_ids[i]], 'guess': self.brackets[self.bracket_ids[i]]}
+
+def write(data: dict, path: Path = COLUMNAR_FILE):
+    """Write the store atomically; readers with the old file mapped keep their copy"""
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(encode(data))
+    tmp.replace(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert WA Bitcoiners Vote data to and from the columnar store")
+    parser.add_argument('--data', type=Path, default=DATA_FILE)
+    parser.add_argument('--store', type=Path, default=COLUMNAR_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help="write the columnar store from the poll data")
+    export = sub.add_parser('export', help="write the columnar store back out as JSON")
+    export.add_argument('out', type=Path)
+    sub.add_parser('check', help="verify the store converts back to the poll data exactly")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        data = open_source(args.data).read()[1]
+        write(data, args.store)
+        store = ColumnarPolls(args.store)
+        print(f"📦 {args.store}: {len(store):,} votes, {len(store.players):,} players, "
+              f"{len(store.brackets):,} brackets, {args.store.stat().st_size:,} bytes "
+              f"(JSON {args.data.stat().st_size:,})")
+    elif args.command == 'export':
+        store = ColumnarPolls(args.store)
+        write_atomic(args.out, json.dumps(store.to_data(), indent=2, ensure_ascii=False) + '\n')
+        print(f"📄 {args.out}: {len(store):,} votes")
+    else:
+        original = open_source(args.data).read()[1]
+        restored = ColumnarPolls(args.store).to_data()
+        if json.dumps(original) != json.dumps(restored):
+            print(f"❌ {args.store} does not match {args.data}")
+            sys.exit(1)
+        print(f"✅ {args.store} matches {args.data}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Groups
+
+One server can host the site for several meetup groups. Each group is a
+shard of its own in data/groups/<group>/: a polls.json (or a poll log
+beside it), an optional aliases.json and the group's standings snapshot.
+data/polls.json is still served at /, and a group at /<group>/ with the
+same paths beneath it (/<group>/api/..., /<group>/events, POST
+/<group>/api/polls/...).
+
+A group is loaded by its first request. Groups keeps the loaded sites in
+least-recently-used order and re-measures a site's memory after any
+request that may have grown it; once the total passes max_bytes, the
+least recently used sites without live clients are closed and dropped.
+A dropped group is simply loaded again by its next request.
+
+Usage:
+    python3 groups.py              # list the groups
+    python3 groups.py new perth    # start a group with no polls yet
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import types
+from collections import OrderedDict
+from pathlib import Path
+
+import metrics
+from poll_log import LOG_FILE
+
+STATIC_ROOT = Path(__file__).parent
+GROUPS_DIR = STATIC_ROOT / "data" / "groups"
+DEFAULT = 'default'
+NAME_RE = re.compile(r'^[a-z0-9][a-z0-9-]{0,62}$')
+# Paths the server answers at the root, and the static files and directories
+# served beside them (images/, data/, ...), so no group can take them
+RESERVED = {DEFAULT, 'api', 'events', 'metrics', 'img'} | \
+           {p.name for p in STATIC_ROOT.iterdir() if NAME_RE.match(p.name)}
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+LOADS = metrics.REGISTRY.counter('wabv_group_loads_total', "Group sites loaded, on first use or after eviction",
+                                 ['group'])
+EVICTIONS = metrics.REGISTRY.counter('wabv_group_evictions_total',
+                                     "Group sites dropped to stay within the memory budget", ['group'])
+
+# Shared with every site, or not memory a site holds
+_NOT_SIZED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+              threading.Thread)
+
+def valid_name(name: str) -> bool:
+    # Also checked on disk, for directories that appear later (a build's site/)
+    return bool(NAME_RE.match(name)) and name not in RESERVED and not (STATIC_ROOT / name).exists()
+
+def data_file(name: str, groups_dir: Path = GROUPS_DIR) -> Path:
+    if not valid_name(name):
+        raise ValueError(f"invalid group name {name!r} (lowercase letters, digits and '-'; not one of "
+                         f"{', '.join(sorted(RESERVED))})")
+    return groups_dir / name / "polls.json"
+
+def exists(name: str, groups_dir: Path = GROUPS_DIR) -> bool:
+    if not valid_name(name):
+        return False
+    path = groups_dir / name / "polls.json"
+    return path.exists() or path.with_name(LOG_FILE.name).exists()
+
+def names(groups_dir: Path = GROUPS_DIR) -> list:
+    if not groups_dir.is_dir():
+        return []
+    return sorted(p.name for p in groups_dir.iterdir() if exists(p.name, groups_dir))
+
+def sizeof(obj) -> int:
+    """Approximate bytes reachable from obj, counting each object once"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _NOT_SIZED):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, (str, bytes, bytearray, int, float)):
+            continue
+        if isinstance(o, dict):
+            # Keys and values, not items(): a temporary pair's id can be reused once it's freed
+            stack.extend(list(o.keys()))
+            stack.extend(list(o.values()))
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(list(o))
+        else:
+            if hasattr(o, '__dict__'):
+                stack.append(o.__dict__)
+            for slot in getattr(type(o), '__slots__', ()):
+                stack.append(getattr(o, slot, None))
+    return total
+
+class Groups:
+    """The default site plus group sites, loaded on demand and bounded by memory.
+
+    factory(name, data_file) builds a group's site. A site provides
+    memory_key() (changes whenever it may have grown), busy() (True while
+    it shouldn't be dropped) and close().
+    """
+
+    def __init__(self, default, factory, groups_dir: Path = GROUPS_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.default = default
+        self.factory = factory
+        self.groups_dir = groups_dir
+        self.max_bytes = max_bytes
+        self._sites = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def route(self, path: str) -> tuple:
+        """(group, site, path within the site) for a request path.
+
+        The default site's group is DEFAULT. A bare '/<group>' gives the
+        path '', which should be redirected to '/<group>/'.
+        """
+        head, slash, rest = path.lstrip('/').partition('/')
+        if head in self._sites or exists(head, self.groups_dir):
+            return head, self.get(head), slash + rest
+        return DEFAULT, self.default, path
+
+    def get(self, name: str):
+        with self._lock:
+            site = self._sites.get(name)
+            if site is None:
+                site = self._sites[name] = self.factory(name, data_file(name, self.groups_dir))
+                LOADS.inc(name)
+            else:
+                self._sites.move_to_end(name)
+            return site
+
+    def done(self, name: str, site):
+        """After a request: re-measure the site if it may have grown, then evict past the budget"""
+        if name == DEFAULT:
+            return
+        key = site.memory_key()
+        with self._lock:
+            if self._sites.get(name) is not site or self._sizes.get(name, (None,))[0] == key:
+                return
+        size = sizeof(site)
+        with self._lock:
+            if self._sites.get(name) is not site:
+                return
+            self._sizes[name] = (key, size)
+            evicted = self._evict(keep=name)
+        for site in evicted:
+            site.close()
+
+    def _evict(self, keep: str) -> list:
+        total = sum(size for _, size in self._sizes.values())
+        evicted = []
+        for name, site in list(self._sites.items()):
+            if total <= self.max_bytes:
+                break
+            if name == keep or site.busy():
+                continue
+            del self._sites[name]
+            total -= self._sizes.pop(name, (None, 0))[1]
+            EVICTIONS.inc(name)
+            evicted.append(site)
+        return evicted
+
+    def sizes(self) -> dict:
+        """{(group,): bytes} for the loaded, measured groups"""
+        with self._lock:
+            return {(name,): size for name, (_, size) in self._sizes.items()}
+
+    def loaded(self) -> int:
+        return len(self._sites)
+
+    def data_files(self) -> list:
+        """Every data file served: the default site's, then each group's"""
+        return [self.default.data_file] + [data_file(name, self.groups_dir) for name in names(self.groups_dir)]
+
+    def close(self):
+        with self._lock:
+            sites, self._sites = list(self._sites.values()), OrderedDict()
+            self._sizes.clear()
+        for site in [self.default, *sites]:
+            site.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List or start WA Bitcoiners Vote groups")
+    parser.add_argument('command', nargs='?', choices=('list', 'new'), default='list')
+    parser.add_argument('name', nargs='?', help="group name for new, e.g. perth")
+    parser.add_argument('--dir', type=Path, default=GROUPS_DIR, help="groups directory (default: data/groups)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'new':
+        if not args.name:
+            parser.error("new needs a group name")
+        try:
+            path = data_file(args.name, args.dir)
+        except ValueError as e:
+            parser.error(str(e))
+        if exists(args.name, args.dir):
+            parser.error(f"group {args.name!r} already exists")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'monthly': {}, 'yearly': {}}, indent=2) + '\n')
+        print(f"✅ Created {path}; served at /{args.name}/")
+        return
+
+    found = names(args.dir)
+    if not found:
+        print(f"No groups in {args.dir}")
+    for name in found:
+        print(f"  /{name}/  {data_file(name, args.dir)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+WA Bitcoiners Vote - Guess Parser
+
+Turns bracket strings such as "< $90k", "$90k - $100k", ">$90k" or "$150k"
+into GuessRange values. Every poll reuses a handful of bracket strings, so
+parsed results are memoized by the raw string.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+UNITS = {'': 1, 'k': 1_000, 'm': 1_000_000}
+
+NUMBER = r'\$?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*([kKmM]?)'
+RANGE_RE = re.compile(rf'^{NUMBER}\s*[-–—]\s*{NUMBER}$')
+BOUND_RE = re.compile(rf'^([<>])\s*=?\s*{NUMBER}$')
+VALUE_RE = re.compile(rf'^{NUMBER}$')
+
+class GuessRange(NamedTuple):
+    """Inclusive price range; open ends run to 0 or infinity"""
+    min: float
+    max: float
+    open_min: bool = False
+    open_max: bool = False
+
+    def contains(self, price: float) -> bool:
+        return self.min <= price <= self.max
+
+    def distance(self, price: float) -> float:
+        """How far the price is outside the range (0 when inside)"""
+        if price < self.min:
+            return self.min - price
+        if price > self.max:
+            return price - self.max
+        return 0.0
+
+def to_number(digits: str, unit: str) -> float:
+    return float(digits.replace(',', '')) * UNITS[unit.lower()]
+
+@lru_cache(maxsize=4096)
+def parse_guess(guess: str) -> Optional[GuessRange]:
+    """Parse a guess string, or return None if it isn't a recognisable bracket"""
+    guess = guess.strip()
+
+    m = RANGE_RE.match(guess)
+    if m:
+        low, high = sorted((to_number(m[1], m[2]), to_number(m[3], m[4])))
+        return GuessRange(low, high)
+
+    m = BOUND_RE.match(guess)
+    if m:
+        val = to_number(m[2], m[3])
+        if m[1] == '<':
+            return GuessRange(0.0, val, open_min=True)
+        return GuessRange(val, float('inf'), open_max=True)
+
+    m = VALUE_RE.match(guess)
+    if m:
+        val = to_number(m[1], m[2])
+        return GuessRange(val, val)
+
+    return None
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Screenshot Pipeline
+
+Finds poll screenshots, de-duplicates byte-identical copies by content hash
+and writes content-addressed variants to .cache/images/:
+
+    <hash>.png              original bytes
+    <hash>.webp / .avif     full size, modern formats
+    <hash>-320w.<ext>       thumbnails in each format (and the original one)
+
+Because a file name changes whenever its content does, app.py serves
+/img/<name> with long-lived immutable cache headers. Thumbnails and modern
+formats need Pillow; without it only the hashed originals are written.
+
+Usage:
+    python3 images.py            # process new screenshots
+    python3 images.py --report   # list duplicate files
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+IMAGE_DIRS = ['images', 'monthly-2026', 'yearly-2026']
+CACHE_DIR = ROOT / ".cache" / "images"
+MANIFEST_NAME = "manifest.json"
+SOURCE_SUFFIXES = {'.png', '.jpg', '.jpeg'}
+THUMB_WIDTHS = (320, 640)
+MODERN_FORMATS = ('avif', 'webp')
+CONTENT_TYPES = {
+    'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg',
+    'webp': 'image/webp', 'avif': 'image/avif',
+}
+NAME_RE = re.compile(r'^[0-9a-f]{16}(?:-\d+w)?\.(png|jpe?g|webp|avif)$')
+
+@lru_cache(maxsize=None)
+def pillow():
+    """PIL.Image, imported on first use so serving pages doesn't pay for it; None without Pillow"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+def find_images(root: Path = ROOT) -> list:
+    paths = []
+    for d in IMAGE_DIRS:
+        if (root / d).is_dir():
+            paths += sorted(p for p in (root / d).rglob('*') if p.suffix.lower() in SOURCE_SUFFIXES)
+    return paths
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def group_duplicates(paths: list) -> dict:
+    """Map content hash -> every path with those bytes"""
+    groups = {}
+    for path in paths:
+        groups.setdefault(file_digest(path), []).append(path)
+    return groups
+
+def save_variant(img, path: Path, fmt: str, max_bytes: int) -> bool:
+    """Save one variant, keeping it only if it comes out smaller than max_bytes"""
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        img.save(tmp, format=fmt.upper().replace('JPG', 'JPEG'), optimize=True)
+    except (KeyError, OSError, ValueError):
+        tmp.unlink(missing_ok=True)
+        return False
+    if tmp.stat().st_size >= max_bytes:
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+def write_variants(source: Path, digest: str, cache_dir: Path) -> dict:
+    """Write every variant of one image; returns {'original': name, 'full': {...}, 'thumbs': {...}}"""
+    stem, ext = digest[:16], source.suffix.lower().lstrip('.')
+    entry = {'original': f"{stem}.{ext}", 'width': None, 'full': {}, 'thumbs': {}}
+    shutil.copyfile(source, cache_dir / entry['original'])
+    size = source.stat().st_size
+    Image = pillow()
+    if Image is None:
+        return entry
+
+    with Image.open(source) as img:
+        img.load()
+        entry['width'] = img.width
+        for fmt in MODERN_FORMATS:
+            name = f"{stem}.{fmt}"
+            if save_variant(img, cache_dir / name, fmt, size):
+                entry['full'][fmt] = name
+        for width in THUMB_WIDTHS:
+            if width >= img.width:
+                continue
+            thumb = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+            for fmt in MODERN_FORMATS + (ext,):
+                name = f"{stem}-{width}w.{fmt}"
+                if save_variant(thumb, cache_dir / name, fmt, size):
+                    entry['thumbs'].setdefault(fmt, {})[str(width)] = name
+    return entry
+
+def process(root: Path = ROOT, cache_dir: Path = CACHE_DIR) -> dict:
+    """Bring the variant cache up to date; only images with new content are processed"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+    images = {}
+    sources = {}
+    for digest, paths in group_duplicates(find_images(root)).items():
+        entry = manifest['images'].get(digest)
+        stale = not entry or not (cache_dir / entry['original']).exists() \
+            or (pillow() is not None and entry['width'] is None)
+        if stale:
+            entry = write_variants(paths[0], digest, cache_dir)
+        images[digest] = entry
+        for path in paths:
+            sources[path.relative_to(root).as_posix()] = digest
+    manifest = {'images': images, 'sources': sources}
+    tmp = cache_dir / (MANIFEST_NAME + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, cache_dir / MANIFEST_NAME)
+    return manifest
+
+_manifest_cache = {}
+
+def load_manifest(cache_dir: Path = CACHE_DIR) -> dict:
+    """Manifest written by process(), re-read only when the file changes"""
+    path = cache_dir / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {'images': {}, 'sources': {}}
+    cached = _manifest_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    manifest = json.loads(path.read_text())
+    _manifest_cache[path] = (mtime, manifest)
+    return manifest
+
+def screenshot_for(month_key: str, cache_dir: Path = CACHE_DIR):
+    """Manifest entry for a month's poll screenshot, or None"""
+    manifest = load_manifest(cache_dir)
+    for rel, digest in sorted(manifest['sources'].items()):
+        if Path(rel).stem == month_key:
+            return manifest['images'][digest]
+    return None
+
+def picture_html(entry: dict, alt: str, prefix: str = '/img/') -> str:
+    """Lazy-loaded <picture> thumbnail linking to the full-size screenshot"""
+    original = entry['original']
+    fallback_fmt = original.rsplit('.', 1)[1]
+    sources = ''
+    for fmt in MODERN_FORMATS:
+        thumbs = entry['thumbs'].get(fmt)
+        if thumbs:
+            srcset = ', '.join(f"{prefix}{name} {w}w" for w, name in sorted(thumbs.items(), key=lambda t: int(t[0])))
+            sources += f'<source type="{CONTENT_TYPES[fmt]}" srcset="{srcset}" sizes="(max-width: 768px) 100vw, 320px">'
+    fallback = entry['thumbs'].get(fallback_fmt, {})
+    src = fallback[min(fallback, key=int)] if fallback else original
+    return (f'<a class="screenshot" href="{prefix}{original}"><picture>{sources}'
+            f'<img src="{prefix}{src}" alt="{alt}" loading="lazy"></picture></a>')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process WA Bitcoiners Vote poll screenshots")
+    parser.add_argument('--report', action='store_true', help="only list byte-identical duplicates")
+    args = parser.parse_args(argv)
+
+    if args.report:
+        for digest, paths in group_duplicates(find_images()).items():
+            if len(paths) > 1:
+                print(f"{digest[:16]}: " + ", ".join(p.relative_to(ROOT).as_posix() for p in paths))
+        return
+
+    manifest = process()
+    print(f"🦞 {len(manifest['sources'])} screenshots, {len(manifest['images'])} unique, cached in {CACHE_DIR}")
+    if pillow() is None:
+        print("Pillow not installed: thumbnails and WebP/AVIF variants skipped")
+
+if __name__ == "__main__":
+    main()
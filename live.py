@@ -0,0 +1,214 @@
+"""
+WA Bitcoiners Vote - Live Updates
+
+One watcher thread polls the data source and, when its content changes,
+works out what changed since the last version:
+
+    votes       votes appended to an open month or a yearly poll
+    month       re-rendered card for a month that was settled, edited or added
+    standings   standings rows whose points or wins changed, plus the new order
+    reload      anything the page can't patch in place
+
+Each delta is pushed once to every connected /events client as a
+server-sent event. Client sockets are handed over by the HTTP handler and
+written without blocking, so an open connection doesn't hold a worker
+thread; a client that falls too far behind is dropped, and reconnects with
+Last-Event-ID so it reloads if it missed a version.
+"""
+
+import json
+import threading
+
+import model
+
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+MAX_CLIENT_BUFFER = 256 * 1024
+
+def format_event(event: str, data, event_id: str = None) -> bytes:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+def poll_deltas(old: dict, new: dict):
+    """Yield (event, payload) for polls that changed between two versions of the data"""
+    for kind in ('monthly', 'yearly'):
+        before_polls, after_polls = old.get(kind, {}), new.get(kind, {})
+        for key, poll in after_polls.items():
+            before = before_polls.get(key)
+            if before == poll:
+                continue
+            votes = poll.get('participants', [])
+            if before is not None:
+                old_votes = before.get('participants', [])
+                appended = votes[:len(old_votes)] == old_votes and len(votes) > len(old_votes)
+                others_same = {k: v for k, v in before.items() if k != 'participants'} == \
+                              {k: v for k, v in poll.items() if k != 'participants'}
+                if appended and others_same and (kind == 'yearly' or not poll.get('bitcoin_usd_price')):
+                    yield 'votes', {'kind': kind, 'key': key,
+                                    'votes': [{'name': p['name'], 'guess': p.get('guess', '')}
+                                              for p in votes[len(old_votes):]]}
+                    continue
+            if kind == 'monthly':
+                yield 'month', {'key': key}
+            else:
+                yield 'reload', {}
+        for key in before_polls.keys() - after_polls.keys():
+            yield ('month', {'key': key}) if kind == 'monthly' else ('reload', {})
+
+def standings_delta(old_rows: list, new_rows: list):
+    """Changed rows and, if it moved, the new order; None when nothing changed"""
+    old = {r['name']: r for r in old_rows}
+    changed = [r for r in new_rows if old.get(r['name']) != r]
+    old_order = [r['name'] for r in old_rows]
+    new_order = [r['name'] for r in new_rows]
+    if not changed and old_order == new_order:
+        return None
+    return {'rows': changed, 'order': new_order if old_order != new_order else None}
+
+class EventHub:
+    """Connected event-stream sockets, written without blocking"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def __len__(self):
+        return len(self._clients)
+
+    def attach(self, sock, greeting: bytes = b''):
+        sock.setblocking(False)
+        with self._lock:
+            self._clients[sock] = bytearray(greeting)
+            self._send(sock)
+
+    def publish(self, message: bytes):
+        with self._lock:
+            for sock in list(self._clients):
+                self._clients[sock] += message
+                self._send(sock)
+
+    def flush(self):
+        """Retry sends a full socket buffer cut short"""
+        with self._lock:
+            for sock in [s for s, buffer in self._clients.items() if buffer]:
+                self._send(sock)
+
+    def close(self):
+        with self._lock:
+            for sock in list(self._clients):
+                self._drop(sock)
+
+    def _send(self, sock):
+        buffer = self._clients[sock]
+        try:
+            sent = sock.send(buffer)
+            del buffer[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(sock)
+            return
+        if len(buffer) > MAX_CLIENT_BUFFER:
+            self._drop(sock)
+
+    def _drop(self, sock):
+        del self._clients[sock]
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+class LiveUpdates:
+    """Watches a data source and fans deltas out to every connected client.
+
+    standings(polls) returns rows of {'name', 'points', 'wins'} in rank order;
+    month_html(polls, key) renders one month's card ('' if it is gone). Both
+    get validated model.Polls; a version that fails validation is skipped.
+    """
+
+    def __init__(self, source, standings, month_html, interval: float = 1.0):
+        self.source = source
+        self.standings = standings
+        self.month_html = month_html
+        self.interval = interval
+        self.hub = EventHub()
+        self.version = None
+        self._data = None
+        self._polls = None
+        self._rows = []
+        self._stat_key = None
+        self._lock = threading.Lock()
+        self._stop = None
+
+    def start(self):
+        """Take the current data as the baseline and start watching (once)"""
+        with self._lock:
+            if self._stop is not None:
+                return
+            self._load()
+            self._stop = threading.Event()
+            threading.Thread(target=self._run, name='live-updates', daemon=True).start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        self.hub.close()
+
+    def subscribe(self, sock, last_event_id: str = None):
+        """Hand a socket whose response headers are sent over to the hub"""
+        self.start()
+        # Under the watcher's lock, so a client sees every version exactly once
+        with self._lock:
+            greeting = f"retry: {RETRY_MS}\n\n".encode() + format_event('hello', {}, self.version)
+            if last_event_id and last_event_id != self.version:
+                greeting += format_event('reload', {}, self.version)
+            self.hub.attach(sock, greeting)
+
+    def _load(self):
+        st = self.source.stat()
+        self._stat_key = (st.st_mtime_ns, st.st_size)
+        digest, polls = model.load(self.source)
+        self.version = digest[:16]
+        self._polls = polls
+        # Sources never change a version in place (see poll_log.next_version), so it can be diffed as is
+        self._data = polls.raw
+        self._rows = [{'name': s['name'], 'points': s['points'], 'wins': s['wins']} for s in self.standings(polls)]
+
+    def _run(self):
+        ticks_per_heartbeat = max(1, round(HEARTBEAT_SECONDS / self.interval))
+        tick = 0
+        while not self._stop.wait(self.interval):
+            tick += 1
+            try:
+                self._check()
+            except Exception as e:
+                print(f"Live update failed: {e}")
+            if tick % ticks_per_heartbeat == 0:
+                self.hub.publish(b': ping\n\n')
+            else:
+                self.hub.flush()
+
+    def _check(self):
+        st = self.source.stat()
+        if (st.st_mtime_ns, st.st_size) == self._stat_key:
+            return
+        with self._lock:
+            self._publish_changes()
+
+    def _publish_changes(self):
+        previous, old_data, old_rows = self.version, self._data, self._rows
+        self._load()
+        if self.version == previous:
+            return
+        messages = []
+        for event, payload in poll_deltas(old_data, self._data):
+            if event == 'month':
+                payload['html'] = self.month_html(self._polls, payload['key'])
+            messages.append(format_event(event, payload, self.version))
+        delta = standings_delta(old_rows, self._rows)
+        if delta:
+            messages.append(format_event('standings', delta, self.version))
+        if messages:
+            self.hub.publish(b''.join(messages))
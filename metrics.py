@@ -0,0 +1,198 @@
+"""
+WA Bitcoiners Vote - Metrics
+
+Counters, histograms and gauges kept in process and rendered in the
+Prometheus text format for app.py's /metrics endpoint. Everything is
+thread-safe and cheap enough to leave on.
+
+SlowestProfiles is the opt-in profiler: it runs requests under cProfile and
+keeps .prof dumps for only the N slowest seen so far.
+"""
+
+import cProfile
+import heapq
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(value)}"
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self._values.get(label_values, (None, 0.0))
+            if counts is None:
+                counts = [0] * len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[label_values] = (counts, total + value)
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def samples(self):
+        with self._lock:
+            values = {k: (list(c), s) for k, (c, s) in self._values.items()}
+        for label_values, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labels, label_values, [('le', _number(bound))])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}"
+
+class Gauge:
+    """A value read when metrics are rendered; fn returns a number or {label_values: number}"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, fn, labels=()):
+        self.name, self.help, self.fn, self.labels = name, help, fn, tuple(labels)
+
+    def samples(self):
+        value = self.fn()
+        values = value if isinstance(value, dict) else {(): value}
+        for label_values, v in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(v)}"
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, fn, labels=()):
+        return self.add(Gauge(name, help, fn, labels))
+
+    def render(self) -> str:
+        """Prometheus text exposition format, version 0.0.4"""
+        lines = []
+        for m in self.metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.samples())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram('wabv_stage_seconds', "Time spent in each stage of serving a page", ['stage'])
+CACHE_LOOKUPS = REGISTRY.counter('wabv_cache_lookups_total',
+                                 "Cache lookups by result (hit, revalidated, miss)", ['cache', 'result'])
+
+def stage(name):
+    """Time a block as one stage: with stage('load_data'): ..."""
+    return STAGE_SECONDS.time(name)
+
+def timed_chunks(name, chunks):
+    """Yield from chunks, timing only the work done producing them (not the consumer's)"""
+    elapsed = 0.0
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            STAGE_SECONDS.observe(elapsed + time.perf_counter() - start, name)
+            return
+        elapsed += time.perf_counter() - start
+        yield chunk
+
+class SlowestProfiles:
+    """cProfile dumps for the N slowest requests.
+
+    One request is profiled at a time; others arriving meanwhile run
+    unprofiled, which keeps the overhead bounded under load.
+    """
+
+    def __init__(self, directory: Path, keep: int = 10):
+        self.directory = Path(directory)
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._slowest = []
+
+    @contextmanager
+    def profile(self, label: str):
+        if not self._busy.acquire(blocking=False):
+            yield
+            return
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+            self._record(time.perf_counter() - start, label, profiler)
+        finally:
+            self._busy.release()
+
+    def _record(self, seconds, label, profiler):
+        with self._lock:
+            if len(self._slowest) >= self.keep and seconds <= self._slowest[0][0]:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = re.sub(r'[^A-Za-z0-9._-]+', '_', label).strip('_') or 'root'
+            path = self.directory / f"{seconds * 1e3:09.3f}ms-{name}-{time.time_ns()}.prof"
+            profiler.dump_stats(path)
+            heapq.heappush(self._slowest, (seconds, str(path)))
+            if len(self._slowest) > self.keep:
+                Path(heapq.heappop(self._slowest)[1]).unlink(missing_ok=True)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Data Model
+
+Typed, immutable records for the poll data, built in one validation pass:
+
+    Polls       months, yearly polls and players, plus the raw dict
+    Month       one monthly poll with its votes and closing prices
+    YearlyPoll  one yearly poll
+    Vote        a name, the guess as written and its parsed GuessRange
+    Player      a name and the months they voted in
+
+Validation reports every problem at once (unknown or misspelt fields,
+missing names or guesses, unparseable brackets, bad prices) instead of
+letting .get() defaults hide them. load() caches the result per version of
+a data source, so each change is validated once however many readers ask.
+
+Usage:
+    python3 model.py               # validate data/polls.json (or the poll log)
+"""
+
+import hashlib
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from guesses import GuessRange, parse_guess
+
+DATA_FILE = Path(__file__).parent / "data" / "polls.json"
+
+MONTH_FIELDS = {'month', 'bitcoin_usd_price', 'bitcoin_aud_price', 'participants', 'correct_range', 'notes'}
+YEARLY_FIELDS = {'year', 'bitcoin_usd_price', 'bitcoin_aud_price', 'participants', 'notes'}
+VOTE_FIELDS = {'name', 'guess'}
+MONTH_KEY_RE = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+# Month/YearlyPoll attribute for each price field in the data
+PRICE_ATTRS = {'bitcoin_usd_price': 'usd_price', 'bitcoin_aud_price': 'aud_price'}
+
+class Vote(NamedTuple):
+    name: str
+    guess: str
+    range: GuessRange
+
+class Month(NamedTuple):
+    key: str
+    label: str
+    usd_price: Optional[float]
+    aud_price: Optional[float]
+    votes: tuple
+    correct_range: Optional[str]
+    notes: Optional[str]
+    fingerprint: str
+
+    def price(self, price_key: str = 'bitcoin_usd_price'):
+        return getattr(self, PRICE_ATTRS[price_key])
+
+class YearlyPoll(NamedTuple):
+    key: str
+    year: int
+    usd_price: Optional[float]
+    aud_price: Optional[float]
+    votes: tuple
+    notes: Optional[str]
+
+class Player(NamedTuple):
+    name: str
+    months: tuple
+
+class Polls(NamedTuple):
+    months: dict
+    yearly: dict
+    players: dict
+    raw: dict
+
+class ValidationError(ValueError):
+    """Every problem found in the data; .errors lists them one per line"""
+
+    def __init__(self, errors: list):
+        super().__init__(f"{len(errors)} problem(s) in poll data:\n" + '\n'.join(f"  {e}" for e in errors))
+        self.errors = errors
+
+def month_fingerprint(month_data: dict) -> str:
+    return hashlib.sha256(json.dumps(month_data, sort_keys=True).encode()).hexdigest()
+
+def _check_fields(where: str, poll: dict, allowed: set, errors: list):
+    for field in poll.keys() - allowed:
+        import difflib
+
+        hint = next(iter(difflib.get_close_matches(field, sorted(allowed), n=1)), None)
+        errors.append(f"{where}: unknown field {field!r}" + (f" (did you mean {hint!r}?)" if hint else ""))
+
+def _price(where: str, poll: dict, field: str, errors: list):
+    value = poll.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        errors.append(f"{where}.{field}: expected a positive number or null, got {value!r}")
+        return None
+    return value
+
+def _text(where: str, poll: dict, field: str, errors: list):
+    value = poll.get(field)
+    if value is not None and not isinstance(value, str):
+        errors.append(f"{where}.{field}: expected text, got {value!r}")
+        return None
+    return value
+
+def _votes(where: str, poll: dict, errors: list) -> tuple:
+    participants = poll.get('participants')
+    if participants is None:
+        errors.append(f"{where}: missing 'participants'")
+        return ()
+    if not isinstance(participants, list):
+        errors.append(f"{where}.participants: expected a list")
+        return ()
+    votes = []
+    for i, p in enumerate(participants):
+        at = f"{where}.participants[{i}]"
+        if not isinstance(p, dict):
+            errors.append(f"{at}: expected an object with 'name' and 'guess'")
+            continue
+        _check_fields(at, p, VOTE_FIELDS, errors)
+        name, guess = p.get('name'), p.get('guess')
+        ok = True
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{at}.name: missing or empty")
+            ok = False
+        if not isinstance(guess, str):
+            errors.append(f"{at}.guess: missing" if guess is None else f"{at}.guess: expected text, got {guess!r}")
+            ok = False
+        elif parse_guess(guess) is None:
+            errors.append(f"{at}.guess: can't read {guess!r} as a price range")
+            ok = False
+        if ok:
+            votes.append(Vote(name, guess, parse_guess(guess)))
+    return tuple(votes)
+
+def parse(data: dict) -> Polls:
+    """Validate polls.json-shaped data and build the records; raises ValidationError with every problem"""
+    errors = []
+    if not isinstance(data, dict):
+        raise ValidationError(["top level: expected an object with 'monthly' and 'yearly'"])
+    _check_fields("top level", data, {'monthly', 'yearly'}, errors)
+
+    months, players = {}, {}
+    monthly = data.get('monthly', {})
+    if not isinstance(monthly, dict):
+        errors.append("monthly: expected an object keyed by month")
+        monthly = {}
+    for key, poll in monthly.items():
+        where = f"monthly.{key}"
+        if not MONTH_KEY_RE.match(key):
+            errors.append(f"{where}: month keys look like '2026-01'")
+        if not isinstance(poll, dict):
+            errors.append(f"{where}: expected an object")
+            continue
+        _check_fields(where, poll, MONTH_FIELDS, errors)
+        votes = _votes(where, poll, errors)
+        months[key] = Month(key, _text(where, poll, 'month', errors) or key,
+                            _price(where, poll, 'bitcoin_usd_price', errors),
+                            _price(where, poll, 'bitcoin_aud_price', errors),
+                            votes, _text(where, poll, 'correct_range', errors), _text(where, poll, 'notes', errors),
+                            month_fingerprint(poll))
+        for vote in votes:
+            players.setdefault(vote.name, []).append(key)
+
+    yearly = {}
+    yearly_data = data.get('yearly', {})
+    if not isinstance(yearly_data, dict):
+        errors.append("yearly: expected an object keyed by year")
+        yearly_data = {}
+    for key, poll in yearly_data.items():
+        where = f"yearly.{key}"
+        if not isinstance(poll, dict):
+            errors.append(f"{where}: expected an object")
+            continue
+        _check_fields(where, poll, YEARLY_FIELDS, errors)
+        year = poll.get('year', key)
+        if str(year) != str(key):
+            errors.append(f"{where}.year: {year!r} doesn't match the key")
+        yearly[key] = YearlyPoll(key, int(key) if str(key).isdigit() else key,
+                                 _price(where, poll, 'bitcoin_usd_price', errors),
+                                 _price(where, poll, 'bitcoin_aud_price', errors),
+                                 _votes(where, poll, errors), _text(where, poll, 'notes', errors))
+
+    if errors:
+        raise ValidationError(errors)
+    return Polls(months, yearly, {name: Player(name, tuple(keys)) for name, keys in players.items()}, data)
+
+def as_polls(data) -> Polls:
+    """Polls for either raw data or an already-built Polls"""
+    return data if isinstance(data, Polls) else parse(data)
+
+def as_votes(participants) -> tuple:
+    """Vote records from a list of participant dicts (or Votes, passed through)"""
+    return tuple(p if isinstance(p, Vote) else Vote(p['name'], p.get('guess', ''), parse_guess(p.get('guess', '')))
+                 for p in participants)
+
+_lock = threading.Lock()
+
+def load(source) -> tuple:
+    """(digest, Polls) for a data source's current version, validated once per version.
+
+    The result is kept on the source (source.validated), so it lives and
+    dies with the source. A version that fails validation raises the same
+    ValidationError on every call until the data changes.
+    """
+    digest, data = source.read()
+    with _lock:
+        cached = source.validated
+        if cached is None or cached[0] != digest:
+            try:
+                cached = (digest, parse(data), None)
+            except ValidationError as e:
+                cached = (digest, None, e)
+            source.validated = cached
+    if cached[2]:
+        raise cached[2]
+    return digest, cached[1]
+
+def forget(source):
+    """Drop what load() kept for source"""
+    with _lock:
+        source.validated = None
+
+def main(argv=None):
+    from poll_log import open_source
+
+    path = Path(argv[0]) if argv else DATA_FILE
+    try:
+        _, polls = load(open_source(path))
+    except ValidationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    votes = sum(len(m.votes) for m in polls.months.values())
+    print(f"✅ {len(polls.months)} months, {votes} votes, {len(polls.players)} players, "
+          f"{len(polls.yearly)} yearly polls")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
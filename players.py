@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Player Index
+
+PlayerIndex is built once per data version from a StandingsEngine's scored
+months. It maps each normalized player name to that player's votes in month
+order, so a lookup touches only that player's results instead of scanning
+every month.
+
+Names are matched case- and whitespace-insensitively ("chris" == "Chris"),
+and data/aliases.json can map other spellings onto one player:
+
+    {"Bren Jr": ["Bren Junior", "BrenJr"]}
+
+Distinct names such as "Bren" and "Bren Jr" stay separate players.
+
+Usage:
+    python3 players.py chris
+"""
+
+import json
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from guesses import parse_guess
+
+ALIASES_FILE = Path(__file__).parent / "data" / "aliases.json"
+
+PlayerVote = namedtuple('PlayerVote', 'month label price guess range points correct distance')
+
+def normalize_name(name: str) -> str:
+    return ' '.join(name.split()).casefold()
+
+def load_aliases(path: Path = ALIASES_FILE) -> dict:
+    """Map normalized alias -> canonical name"""
+    try:
+        table = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return {normalize_name(alias): canonical for canonical, aliases in table.items() for alias in aliases}
+
+class PlayerIndex:
+    """Per-player vote history keyed by normalized name"""
+
+    def __init__(self, months: dict, aliases: dict = None):
+        self.aliases = aliases or {}
+        self.names = {}
+        self.votes = {}
+        self._stats = {}
+        for key in sorted(months):
+            entry = months[key]
+            for r in entry['results']:
+                norm = self.resolve(r['name'])
+                guess_range = parse_guess(r['guess'])
+                distance = guess_range.distance(entry['price']) if guess_range is not None else None
+                self.names.setdefault(norm, self.aliases.get(normalize_name(r['name']), r['name']))
+                self.votes.setdefault(norm, []).append(PlayerVote(
+                    key, entry['label'], entry['price'], r['guess'], guess_range, r['points'], r['correct'], distance))
+
+    def resolve(self, name: str) -> str:
+        """Normalized key for a name, following the alias table"""
+        norm = normalize_name(name)
+        canonical = self.aliases.get(norm)
+        return normalize_name(canonical) if canonical else norm
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) in self.votes
+
+    def display_name(self, name: str) -> str:
+        return self.names[self.resolve(name)]
+
+    def history(self, name: str) -> list:
+        """One player's votes in month order (empty if unknown)"""
+        return self.votes.get(self.resolve(name), [])
+
+    def stats(self, name: str) -> dict:
+        """Hit rate, streaks, points and average distance to price; memoized per player"""
+        norm = self.resolve(name)
+        if norm in self._stats:
+            return self._stats[norm]
+        votes = self.votes.get(norm, [])
+        longest = current = 0
+        for v in votes:
+            current = current + 1 if v.correct else 0
+            longest = max(longest, current)
+        distances = [v.distance for v in votes if v.distance is not None]
+        stats = {
+            'name': self.names.get(norm, name),
+            'votes': len(votes),
+            'points': sum(v.points for v in votes),
+            'correct': sum(1 for v in votes if v.correct),
+            'hit_rate': sum(1 for v in votes if v.correct) / len(votes) if votes else 0.0,
+            'current_streak': current,
+            'longest_streak': longest,
+            'avg_distance': sum(distances) / len(distances) if distances else None,
+        }
+        self._stats[norm] = stats
+        return stats
+
+def main(argv=None):
+    from calculate_points import DATA_FILE, score_month
+    from poll_log import open_source
+    from standings import StandingsEngine
+
+    names = sys.argv[1:] if argv is None else argv
+    if not names:
+        print("Usage: python3 players.py <name> [<name> ...]")
+        sys.exit(2)
+    engine = StandingsEngine(score_month, score_month.id)
+    engine.sync(open_source(DATA_FILE).read()[1])
+    index = PlayerIndex(engine.months, load_aliases())
+    for name in names:
+        if name not in index:
+            print(f"❓ {name}: no votes")
+            continue
+        s = index.stats(name)
+        avg = f"${s['avg_distance']:,.0f}" if s['avg_distance'] is not None else "n/a"
+        print(f"🦞 {s['name']}: {s['points']} pts, {s['correct']}/{s['votes']} correct ({s['hit_rate']:.0%}), "
+              f"streak {s['current_streak']} (best {s['longest_streak']}), avg distance {avg}")
+        for v in index.history(name):
+            print(f"  {'🎯' if v.correct else '  '} {v.label}: {v.guess} - {v.points} pts")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Append-only Poll Log
+
+Poll changes are stored as JSON lines in data/polls.log.jsonl:
+
+    {"type": "poll_created", "kind": "monthly", "key": "2026-06", "fields": {"month": "June 2026"}}
+    {"type": "vote_added", "kind": "monthly", "key": "2026-06", "name": "Zee", "guess": "$90k - $100k"}
+    {"type": "price_settled", "kind": "monthly", "key": "2026-06", "currency": "usd", "price": 101000}
+    {"type": "poll_updated", "kind": "monthly", "key": "2026-06", "fields": {"notes": "..."}}
+
+Appending is O(1). The current state is rebuilt by replaying the log on top
+of the last compacted snapshot (data/polls.snapshot.json), and a reader that
+stays alive only reads lines appended since its previous read. polls.json is
+re-exported on every compaction so existing tools keep working.
+
+Usage:
+    python3 poll_log.py import                       # seed the log from polls.json
+    python3 poll_log.py create monthly 2026-06 "June 2026"
+    python3 poll_log.py vote monthly 2026-06 Zee '$90k - $100k'
+    python3 poll_log.py settle monthly 2026-06 101000 [--currency usd]
+    python3 poll_log.py compact                      # snapshot + export polls.json
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DATA_FILE = Path(__file__).parent / "data" / "polls.json"
+LOG_FILE = DATA_FILE.with_name("polls.log.jsonl")
+SNAPSHOT_FILE = DATA_FILE.with_name("polls.snapshot.json")
+
+SNAPSHOT_EVERY = 500
+
+EVENT_TYPES = ('poll_created', 'poll_updated', 'vote_added', 'price_settled')
+
+def write_atomic(path: Path, text: str):
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive lock on path (via path.lock) across processes, for read-modify-write of a data file.
+
+    Without fcntl (Windows) this does nothing, and only the in-process
+    locks protect writers.
+    """
+    with open(path.with_name(path.name + '.lock'), 'a') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def is_price_field(field: str) -> bool:
+    return field.startswith('bitcoin_') and field.endswith('_price')
+
+def check_event(state: dict, event: dict, pending=()):
+    """Raise ValueError if event can't be applied to state (plus polls created in pending)"""
+    if event.get('type') not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type: {event.get('type')!r}")
+    if event.get('kind') not in ('monthly', 'yearly'):
+        raise ValueError(f"Unknown poll kind: {event.get('kind')!r}")
+    key = event.get('key')
+    if event['type'] != 'poll_created' and key not in state.get(event['kind'], {}) \
+            and (event['kind'], key) not in pending:
+        raise ValueError(f"No {event['kind']} poll {key!r}")
+
+def apply_event(state: dict, event: dict):
+    """Apply one log event to a polls.json-shaped state dict"""
+    polls = state.setdefault(event['kind'], {})
+    kind = event['type']
+    if kind == 'poll_created':
+        poll = polls.setdefault(event['key'], {})
+        poll.update(event.get('fields', {}))
+        poll.setdefault('participants', [])
+    elif kind == 'poll_updated':
+        polls[event['key']].update(event['fields'])
+    elif kind == 'vote_added':
+        polls[event['key']]['participants'].append({'name': event['name'], 'guess': event['guess']})
+    elif kind == 'price_settled':
+        polls[event['key']][f"bitcoin_{event.get('currency', 'usd')}_price"] = event['price']
+    else:
+        raise ValueError(f"Unknown event type: {kind!r}")
+
+def next_version(state: dict, events: list) -> dict:
+    """state with events applied, as a new dict; state itself is left untouched.
+
+    Only the top levels and the polls the events touch are copied, so the
+    rest is shared between versions.
+    """
+    state = {k: dict(v) if isinstance(v, dict) else v for k, v in state.items()}
+    copied = set()
+    for event in events:
+        polls = state.setdefault(event['kind'], {})
+        if (event['kind'], event['key']) not in copied:
+            copied.add((event['kind'], event['key']))
+            if event['key'] in polls:
+                polls[event['key']] = copy.deepcopy(polls[event['key']])
+        apply_event(state, event)
+    return state
+
+def events_from_data(data: dict) -> list:
+    """Events that rebuild an existing polls.json document, key order included"""
+    events = []
+    for kind in ('monthly', 'yearly'):
+        for key, poll in data.get(kind, {}).items():
+            fields = {k: [] if k == 'participants' else None if is_price_field(k) else v
+                      for k, v in poll.items()}
+            events.append({'type': 'poll_created', 'kind': kind, 'key': key, 'fields': fields})
+            for p in poll.get('participants', []):
+                events.append({'type': 'vote_added', 'kind': kind, 'key': key, 'name': p['name'], 'guess': p['guess']})
+            for field, price in poll.items():
+                if is_price_field(field) and price is not None:
+                    events.append({'type': 'price_settled', 'kind': kind, 'key': key,
+                                   'currency': field[len('bitcoin_'):-len('_price')], 'price': price})
+    return events
+
+class JsonFileSource:
+    """polls.json read whole; the content hash decides whether it really changed"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        # model.load()'s (digest, Polls, error) for the last version read
+        self.validated = None
+
+    def stat(self):
+        return self.path.stat()
+
+    def read(self):
+        """(digest, data) for the current file contents"""
+        raw = self.path.read_bytes()
+        return hashlib.sha256(raw).hexdigest(), json.loads(raw)
+
+class PollLog:
+    """Append-only event log with periodic compacted snapshots"""
+
+    def __init__(self, path: Path = LOG_FILE, snapshot_path: Path = SNAPSHOT_FILE,
+                 export_path: Path = DATA_FILE, snapshot_every: int = SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.export_path = export_path
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._state = None
+        self._offset = 0
+        self._since_snapshot = 0
+        # model.load()'s (digest, Polls, error) for the last version read
+        self.validated = None
+
+    def stat(self):
+        return self.path.stat()
+
+    def append(self, *events):
+        """Validate and append events, then fold them into the in-memory state"""
+        lines = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in events)
+        with self._lock:
+            state = self.state()
+            created = set()
+            for e in events:
+                check_event(state, e, created)
+                if e['type'] == 'poll_created':
+                    created.add((e['kind'], e['key']))
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self.state()
+            if self._since_snapshot >= self.snapshot_every:
+                self.compact()
+
+    def state(self) -> dict:
+        """Current state; only lines appended since the last call are read.
+
+        Each version is a dict of its own that later appends never change
+        (see next_version), so readers can hold on to it without the lock.
+        It is shared with other callers, so treat it as read-only.
+        """
+        with self._lock:
+            if self._state is None:
+                self._load_snapshot()
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                tail = f.read()
+            end = tail.rfind(b'\n') + 1
+            events = [json.loads(line) for line in tail[:end].splitlines() if line.strip()]
+            if events:
+                self._state = next_version(self._state, events)
+                self._since_snapshot += len(events)
+            self._offset += end
+            return self._state
+
+    def read(self):
+        """(digest, data) for the current log contents"""
+        with self._lock:
+            state = self.state()
+            st = self.path.stat()
+            return hashlib.sha256(f"{st.st_ino}:{self._offset}".encode()).hexdigest(), state
+
+    def _load_snapshot(self):
+        self._state, self._offset = {'monthly': {}, 'yearly': {}}, 0
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text())
+        except (OSError, ValueError):
+            return
+        if snapshot['offset'] <= self.path.stat().st_size:
+            self._state, self._offset = snapshot['state'], snapshot['offset']
+
+    def compact(self):
+        """Snapshot the current state and re-export polls.json"""
+        with self._lock:
+            state = self.state()
+            write_atomic(self.snapshot_path, json.dumps({'offset': self._offset, 'state': state}))
+            write_atomic(self.export_path, json.dumps(state, indent=2, ensure_ascii=False) + '\n')
+            self._since_snapshot = 0
+
+def open_source(data_file: Path = DATA_FILE):
+    """The poll log next to data_file if one has been started, else data_file itself"""
+    log_file = data_file.with_name(LOG_FILE.name)
+    if log_file.exists():
+        return PollLog(log_file, data_file.with_name(SNAPSHOT_FILE.name), data_file)
+    return JsonFileSource(data_file)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WA Bitcoiners Vote poll log")
+    parser.add_argument('--data', type=Path, default=DATA_FILE, help="polls.json the log sits next to")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('import', help="seed an empty log from polls.json")
+    create = sub.add_parser('create', help="open a new poll")
+    create.add_argument('kind', choices=['monthly', 'yearly'])
+    create.add_argument('key')
+    create.add_argument('label')
+    vote = sub.add_parser('vote', help="add a vote")
+    vote.add_argument('kind', choices=['monthly', 'yearly'])
+    vote.add_argument('key')
+    vote.add_argument('name')
+    vote.add_argument('guess')
+    settle = sub.add_parser('settle', help="record the closing price")
+    settle.add_argument('kind', choices=['monthly', 'yearly'])
+    settle.add_argument('key')
+    settle.add_argument('price', type=float)
+    settle.add_argument('--currency', default='usd')
+    sub.add_parser('compact', help="write a snapshot and export polls.json")
+    args = parser.parse_args(argv)
+
+    log_file = args.data.with_name(LOG_FILE.name)
+    log = PollLog(log_file, args.data.with_name(SNAPSHOT_FILE.name), args.data)
+
+    if args.command == 'import':
+        if log_file.exists() and log_file.stat().st_size:
+            parser.error(f"{log_file} already has events")
+        data = json.loads(args.data.read_text())
+        log_file.touch()
+        log.append(*events_from_data(data))
+        log.compact()
+        print(f"Imported {args.data} into {log_file}")
+        return
+    if not log_file.exists():
+        parser.error(f"{log_file} does not exist; run 'import' first")
+
+    try:
+        with file_lock(log_file):
+            run_command(log, args)
+    except ValueError as e:
+        parser.error(str(e))
+
+def run_command(log: PollLog, args):
+    if args.command == 'create':
+        field = 'month' if args.kind == 'monthly' else 'year'
+        label = args.label if args.kind == 'monthly' else int(args.label)
+        log.append({'type': 'poll_created', 'kind': args.kind, 'key': args.key, 'fields': {field: label}})
+    elif args.command == 'vote':
+        log.append({'type': 'vote_added', 'kind': args.kind, 'key': args.key, 'name': args.name, 'guess': args.guess})
+    elif args.command == 'settle':
+        price = int(args.price) if args.price.is_integer() else args.price
+        log.append({'type': 'price_settled', 'kind': args.kind, 'key': args.key,
+                    'currency': args.currency.lower(), 'price': price})
+    elif args.command == 'compact':
+        log.compact()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - BTC Price Settlement
+
+Closing prices come from a pluggable PriceSource and are kept in an on-disk
+daily time series, data/prices.json:
+
+    {"usd": {"2026-02-01": 78632.0, ...}, "aud": {...}}
+
+A month's close is the price at 00:00 UTC on the first day of the next
+month. Settling fetches every missing close for every currency in one
+batched call per currency, then records the prices in the poll data
+(through the poll log when one exists). Pages only ever read the cache, so
+rendering never waits on a price lookup.
+
+Usage:
+    python3 prices.py settle                       # settle closed months missing a price
+    python3 prices.py backfill 2025-12 2026-05     # fill the cache for a range of months
+    python3 prices.py --source fixture:backup/prices.json settle   # offline, from a file shaped like prices.json
+"""
+
+import argparse
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from poll_log import PollLog, file_lock, open_source, write_atomic
+
+DATA_FILE = Path(__file__).parent / "data" / "polls.json"
+PRICES_FILE = DATA_FILE.with_name("prices.json")
+CURRENCIES = ('usd', 'aud')
+
+def month_close(month_key: str) -> str:
+    """ISO date whose 00:00 UTC price closes the month ("2026-01" -> "2026-02-01")"""
+    year, month = map(int, month_key.split('-'))
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01"
+
+def month_range(start: str, end: str) -> list:
+    keys = []
+    year, month = map(int, start.split('-'))
+    while f"{year:04d}-{month:02d}" <= end:
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+class PriceSource:
+    """Adapter interface: fetch many daily prices in one call"""
+
+    name = 'base'
+
+    def fetch(self, currency: str, dates: list) -> dict:
+        """Map each ISO date it knows -> BTC price at 00:00 UTC in currency"""
+        raise NotImplementedError
+
+class FixturePriceSource(PriceSource):
+    """Prices from a JSON file shaped like data/prices.json; a local stand-in for tests"""
+
+    name = 'fixture'
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def fetch(self, currency, dates):
+        series = json.loads(self.path.read_text()).get(currency, {})
+        return {d: series[d] for d in dates if d in series}
+
+class CoinGeckoSource(PriceSource):
+    """CoinGecko market_chart/range: one request covers every date for a currency"""
+
+    name = 'coingecko'
+    URL = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range?vs_currency={}&from={}&to={}"
+
+    def __init__(self, api_key: str = None, timeout: float = 30):
+        self.api_key = api_key or os.environ.get('COINGECKO_API_KEY')
+        self.timeout = timeout
+
+    def fetch(self, currency, dates):
+        # Imported here: urllib.request pulls in ssl and http.client, which the page render never needs
+        import urllib.request
+
+        if not dates:
+            return {}
+        stamps = [datetime.fromisoformat(d).replace(tzinfo=timezone.utc).timestamp() for d in dates]
+        url = self.URL.format(currency, int(min(stamps)) - 86400, int(max(stamps)) + 86400)
+        request = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        if self.api_key:
+            request.add_header('x-cg-demo-api-key', self.api_key)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            points = json.load(response)['prices']
+        prices = {}
+        for date, stamp in zip(dates, stamps):
+            ms, price = min(points, key=lambda p: abs(p[0] / 1000 - stamp), default=(None, None))
+            if ms is not None and abs(ms / 1000 - stamp) <= 86400:
+                prices[date] = round(price, 2)
+        return prices
+
+def make_source(spec: str) -> PriceSource:
+    """'coingecko' or 'fixture:<path>'"""
+    if spec == 'coingecko':
+        return CoinGeckoSource()
+    if spec.startswith('fixture:'):
+        return FixturePriceSource(spec[len('fixture:'):])
+    raise ValueError(f"Unknown price source: {spec!r}")
+
+class PriceCache:
+    """Daily price series per currency, re-read only when the file changes"""
+
+    def __init__(self, path: Path = PRICES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._series = {}
+
+    def series(self) -> dict:
+        with self._lock:
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except OSError:
+                return {}
+            if mtime != self._mtime:
+                self._series = json.loads(self.path.read_text())
+                self._mtime = mtime
+            return self._series
+
+    def get(self, currency: str, date: str):
+        return self.series().get(currency, {}).get(date)
+
+    def close(self, month_key: str, currency: str):
+        return self.get(currency, month_close(month_key))
+
+    def update(self, currency: str, prices: dict):
+        if not prices:
+            return
+        series = json.loads(json.dumps(self.series()))
+        series.setdefault(currency, {}).update(prices)
+        series[currency] = dict(sorted(series[currency].items()))
+        write_atomic(self.path, json.dumps(series, indent=2) + '\n')
+
+def backfill(cache: PriceCache, source: PriceSource, month_keys: list, currencies=CURRENCIES,
+             now: datetime = None) -> dict:
+    """Fetch every missing close for closed months, one call per currency; returns the new prices"""
+    now = now or datetime.now(timezone.utc)
+    closes = [month_close(k) for k in month_keys]
+    closes = [d for d in closes if datetime.fromisoformat(d).replace(tzinfo=timezone.utc) <= now]
+    fetched = {}
+    for currency in currencies:
+        missing = [d for d in closes if cache.get(currency, d) is None]
+        if missing:
+            fetched[currency] = source.fetch(currency, missing)
+            cache.update(currency, fetched[currency])
+    return fetched
+
+def settle(data_file: Path = DATA_FILE, cache: PriceCache = None, source: PriceSource = None,
+           currencies=CURRENCIES, now: datetime = None) -> dict:
+    """Record closing prices for closed months that lack them; returns {month: {field: price}}"""
+    cache = cache or PriceCache(data_file.with_name(PRICES_FILE.name))
+    data_source = open_source(data_file)
+    monthly = data_source.read()[1].get('monthly', {})
+    missing = [k for k, m in monthly.items() if any(m.get(f"bitcoin_{c}_price") is None for c in currencies)]
+    if source is not None:
+        backfill(cache, source, missing, currencies, now)
+
+    settled = {}
+    for key in missing:
+        for currency in currencies:
+            field = f"bitcoin_{currency}_price"
+            price = cache.close(key, currency)
+            if monthly[key].get(field) is None and price is not None:
+                settled.setdefault(key, {})[field] = round(price)
+    if not settled:
+        return settled
+
+    if isinstance(data_source, PollLog):
+        with file_lock(data_source.path):
+            data_source.append(*[{'type': 'price_settled', 'kind': 'monthly', 'key': key,
+                                  'currency': field[len('bitcoin_'):-len('_price')], 'price': price}
+                                 for key, fields in settled.items() for field, price in fields.items()])
+    else:
+        with file_lock(data_file):
+            data = json.loads(data_file.read_text())
+            for key, fields in settled.items():
+                data['monthly'][key].update(fields)
+            write_atomic(data_file, json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+    return settled
+
+def start_settler(data_files, source: PriceSource, interval: float = 3600) -> threading.Event:
+    """Settle closed months in a background thread every interval seconds; set the event to stop.
+
+    data_files is a data file, or a callable returning the data files to
+    settle each round (so groups started later are picked up). They share
+    one price cache, so each close is fetched once.
+    """
+    stop = threading.Event()
+    files = data_files if callable(data_files) else lambda: [data_files]
+
+    def run():
+        while not stop.is_set():
+            cache = PriceCache()
+            for data_file in files():
+                try:
+                    settle(data_file, cache, source)
+                except Exception as e:
+                    print(f"Price settlement failed for {data_file}: {e}")
+            stop.wait(interval)
+
+    threading.Thread(target=run, name='price-settler', daemon=True).start()
+    return stop
+
+_default_cache = PriceCache()
+
+def cached_close(month_key: str, currency: str):
+    """Closing price from the on-disk cache only; never fetches"""
+    return _default_cache.close(month_key, currency)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Settle WA Bitcoiners Vote months with BTC closing prices")
+    parser.add_argument('--data', type=Path, default=DATA_FILE)
+    parser.add_argument('--source', default='coingecko', help="coingecko or fixture:<path> (default: coingecko)")
+    parser.add_argument('--currency', action='append', choices=CURRENCIES,
+                        help="currency to settle (repeatable; default: all)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('settle', help="settle closed months that are missing a price")
+    fill = sub.add_parser('backfill', help="fill the price cache for a range of months")
+    fill.add_argument('start', help="first month, e.g. 2025-12")
+    fill.add_argument('end', help="last month, e.g. 2026-05")
+    args = parser.parse_args(argv)
+
+    source = make_source(args.source)
+    currencies = tuple(args.currency or CURRENCIES)
+    cache = PriceCache(args.data.with_name(PRICES_FILE.name))
+    if args.command == 'backfill':
+        fetched = backfill(cache, source, month_range(args.start, args.end), currencies)
+        for currency, prices in fetched.items():
+            print(f"💰 {currency.upper()}: {len(prices)} closes cached")
+    else:
+        settled = settle(args.data, cache, source, currencies)
+        for key, fields in settled.items():
+            print(f"💰 {key}: " + ", ".join(f"{f} = {p:,}" for f, p in fields.items()))
+        if not settled:
+            print("Nothing to settle")
+
+if __name__ == "__main__":
+    main()
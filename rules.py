@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Scoring Rules
+
+A scoring rule is plain data, e.g. the documented monthly rule:
+
+    {"exact": 3, "closest_miss": 1}
+
+    exact         points for a bracket containing the close
+    closest_miss  points for the nearest bracket(s) not containing it
+    closest       points for the nearest bracket(s), containing it or not
+    distance      {"points": P, "width": W}: a miss d away earns P * (1 - d/W)
+    seasons       multipliers by month key: "12" (every December),
+                  "2026" (a whole year) or "2026-12" (one month)
+
+A bracket earns the best of the points its rules award, times the season
+multiplier. compile_rule() turns a spec into a Scorer once; scoring a month
+then works per distinct bracket and spreads the points to each vote.
+
+The notes in polls.json record how past months were scored and serve as
+golden results: `check` re-scores the whole history under a rule in one
+pass and compares every player the notes mention.
+
+Usage:
+    python3 rules.py                       # list the rules
+    python3 rules.py check                 # standard rule against the notes
+    python3 rules.py check --rule closest-wins
+    python3 rules.py standings --rule my-rule.json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from model import as_polls, as_votes
+from scoring import NUMPY_MIN_CELLS, _numpy, bracket_distances, distance_matrix, group_by_bracket
+
+RULES = {
+    'standard': {'exact': 3, 'closest_miss': 1},
+    'correct-only': {'exact': 3},
+    'closest-wins': {'closest': 3},
+    'distance': {'exact': 3, 'distance': {'points': 2, 'width': 10_000}},
+}
+RULE_FIELDS = {'exact', 'closest_miss', 'closest', 'distance', 'seasons'}
+
+NOTES_PRICE_RE = re.compile(r'Price was \$([\d,]+)')
+NOTES_RESULT_RE = re.compile(r'([^.()]+?) guessed [^()]*\([^()]*?(\d+)\s*pts?(?: each)?\)')
+
+def _number(where: str, value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{where}: expected a number >= 0, got {value!r}")
+    return value
+
+def _rounded(points):
+    return int(points) if points == int(points) else round(points, 2)
+
+class Scorer:
+    """A compiled scoring rule; call it like score_month(votes, price, month_key)"""
+
+    def __init__(self, name: str, spec: dict):
+        if not isinstance(spec, dict):
+            raise ValueError(f"rule {name!r}: expected an object")
+        unknown = spec.keys() - RULE_FIELDS
+        if unknown:
+            raise ValueError(f"rule {name!r}: unknown field(s) {', '.join(sorted(unknown))}")
+        self.name = name
+        self.spec = spec
+        # Snapshots are keyed on this, so editing a rule re-scores everything
+        self.id = f"{name}@{hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]}"
+        self.exact = _number('exact', spec.get('exact', 0))
+        self.closest_miss = _number('closest_miss', spec.get('closest_miss', 0))
+        self.closest = _number('closest', spec.get('closest', 0))
+        distance = spec.get('distance') or {}
+        self.distance_points = _number('distance.points', distance.get('points', 0))
+        self.distance_width = _number('distance.width', distance.get('width', 1)) or 1
+        self.seasons = {str(k): _number(f'seasons.{k}', v) for k, v in spec.get('seasons', {}).items()}
+        self._multipliers = {}
+
+    def __repr__(self):
+        return f"Scorer({self.name!r}, {self.spec!r})"
+
+    def multiplier(self, month_key) -> float:
+        if not self.seasons or month_key is None:
+            return 1
+        factor = self._multipliers.get(month_key)
+        if factor is None:
+            year, _, month = month_key.partition('-')
+            factor = 1
+            for key in {month_key, year, month}:
+                factor *= self.seasons.get(key, 1)
+            self._multipliers[month_key] = factor
+        return factor
+
+    def bracket_points(self, ranges, price: float, month_key: str = None) -> list:
+        """Points for each bracket (GuessRange or None) at one closing price"""
+        dist = bracket_distances(ranges, price)
+        finite = [d for d in dist if d != float('inf')]
+        nearest = min(finite, default=None)
+        nearest_miss = min((d for d in finite if d > 0), default=None)
+        factor = self.multiplier(month_key)
+        points = []
+        for d in dist:
+            if d == float('inf'):
+                points.append(0)
+                continue
+            best = self.closest if d == nearest else 0
+            if d == 0:
+                best = max(best, self.exact)
+            else:
+                if d == nearest_miss:
+                    best = max(best, self.closest_miss)
+                if d < self.distance_width:
+                    best = max(best, self.distance_points * (1 - d / self.distance_width))
+            points.append(_rounded(best * factor))
+        return points
+
+    def grid(self, ranges, prices, month_key: str = None) -> list:
+        """bracket_points for many candidate prices, as a len(prices) x len(ranges) grid"""
+        np = _numpy() if ranges and len(ranges) * len(prices) >= NUMPY_MIN_CELLS else None
+        if np is None:
+            return [self.bracket_points(ranges, price, month_key) for price in prices]
+        # Same rules as bracket_points, one whole grid row per price
+        dist = distance_matrix(np, ranges, prices)
+        finite = np.isfinite(dist)
+        miss = finite & (dist > 0)
+        nearest = np.where(finite, dist, np.inf).min(axis=1, keepdims=True)
+        nearest_miss = np.where(miss, dist, np.inf).min(axis=1, keepdims=True)
+        best = np.where(finite & (dist == nearest), float(self.closest), 0.0)
+        best = np.where(dist == 0, np.maximum(best, self.exact), best)
+        best = np.where(miss & (dist == nearest_miss), np.maximum(best, self.closest_miss), best)
+        near = miss & (dist < self.distance_width)
+        # Unparseable brackets give 0 * -inf here, which near masks out
+        with np.errstate(invalid='ignore'):
+            sliding = self.distance_points * (1 - dist / self.distance_width)
+        best = np.where(near, np.maximum(best, sliding), best)
+        factor = self.multiplier(month_key)
+        return [[_rounded(points * factor) for points in row] for row in best.tolist()]
+
+    def __call__(self, votes, price: float, month_key: str = None) -> list:
+        """Per-vote results, highest points first, in the shape StandingsEngine stores"""
+        votes = as_votes(votes)
+        groups = group_by_bracket(votes)
+        ranges = [votes[indexes[0]].range for indexes in groups.values()]
+        points = dict(zip(groups, self.bracket_points(ranges, price, month_key)))
+        results = [{'name': v.name, 'guess': v.guess, 'points': points[v.guess],
+                    'correct': v.range is not None and v.range.contains(price)} for v in votes]
+        return sorted(results, key=lambda r: -r['points'])
+
+def compile_rule(spec, name: str = 'custom') -> Scorer:
+    return Scorer(name, spec)
+
+@lru_cache(maxsize=None)
+def get_scorer(rule: str) -> Scorer:
+    """Scorer for a rule name in RULES or a path to a JSON rule file"""
+    if rule in RULES:
+        return Scorer(rule, RULES[rule])
+    path = Path(rule)
+    if path.suffix != '.json':
+        raise ValueError(f"unknown rule {rule!r} (choose from {', '.join(RULES)} or a .json file)")
+    try:
+        spec = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        raise ValueError(f"can't read rule {rule!r}: {e}") from None
+    return Scorer(path.stem, spec)
+
+def golden(notes: str) -> tuple:
+    """(price, {name: points}) recorded in a month's notes; price is None if not given"""
+    price = NOTES_PRICE_RE.search(notes or '')
+    expected = {}
+    for m in NOTES_RESULT_RE.finditer(notes or ''):
+        for name in m[1].split('/'):
+            expected[name.strip()] = int(m[2])
+    return (float(price[1].replace(',', '')) if price else None), expected
+
+def check(data, scorer: Scorer, price_key: str = 'bitcoin_usd_price') -> tuple:
+    """Re-score all history under scorer and compare with the notes.
+
+    Returns (mismatches, warnings, players checked) as lists of lines. A
+    warning notes a month whose notes quote a different close than the
+    data; the data is what's scored, so only mismatches mean the points
+    disagree.
+    """
+    from standings import StandingsEngine
+
+    polls = as_polls(data)
+    engine = StandingsEngine(scorer, scorer.id, price_key=price_key)
+    engine.sync(polls)
+    mismatches, warnings, checked = [], [], 0
+    for key, month in polls.months.items():
+        noted_price, expected = golden(month.notes)
+        if not expected or key not in engine.months:
+            continue
+        price = engine.months[key]['price']
+        if noted_price is not None and noted_price != price:
+            warnings.append(f"{key}: notes say ${noted_price:,.0f}, data says ${price:,.0f}")
+        scored = {r['name']: r['points'] for r in engine.months[key]['results']}
+        for name, points in expected.items():
+            checked += 1
+            if name not in scored:
+                mismatches.append(f"{key}: {name} is in the notes but has no vote")
+            elif scored[name] != points:
+                mismatches.append(f"{key}: {name} scored {scored[name]}, notes say {points}")
+    return mismatches, warnings, checked
+
+def main(argv=None):
+    from poll_log import open_source
+    from standings import StandingsEngine
+
+    parser = argparse.ArgumentParser(description="List, check and try out WA Bitcoiners Vote scoring rules")
+    parser.add_argument('command', nargs='?', choices=('list', 'check', 'standings'), default='list')
+    parser.add_argument('--rule', default='standard', help="rule name or .json rule file (default: standard)")
+    parser.add_argument('--data', type=Path, default=Path(__file__).parent / "data" / "polls.json")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, spec in RULES.items():
+            print(f"  {name}: {json.dumps(spec)}")
+        return
+    try:
+        scorer = get_scorer(args.rule)
+    except ValueError as e:
+        parser.error(str(e))
+    data = open_source(args.data).read()[1]
+
+    if args.command == 'check':
+        mismatches, warnings, checked = check(data, scorer)
+        for line in warnings:
+            print(f"⚠️  {line}")
+        for line in mismatches:
+            print(f"❌ {line}")
+        if mismatches:
+            sys.exit(1)
+        print(f"✅ {scorer.name}: {checked} results match the notes")
+        return
+
+    engine = StandingsEngine(scorer, scorer.id)
+    engine.sync(data)
+    for i, p in enumerate(engine.standings(), 1):
+        print(f"  {i}. {p['name']}: {p['points']} pts ({p['wins']} correct)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+WA Bitcoiners Vote - Bracket Scoring
+
+Scores distinct guess brackets rather than individual participants: a month
+with dozens of votes usually has only four or five brackets. Many candidate
+prices can be scored in one call, which answers "what if BTC closes at X"
+for a whole grid of X values. Large grids use NumPy when it is installed;
+it is imported only then, since loading it takes longer than a whole
+command-line scoring run.
+"""
+
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from guesses import GuessRange
+
+CORRECT_POINTS = 3
+# Below this many bracket x price cells plain Python is as fast as NumPy, without its import cost
+NUMPY_MIN_CELLS = 5_000
+
+@lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def bracket_distances(ranges: Sequence[Optional[GuessRange]], price: float) -> list:
+    """Distance from price to each bracket; unparseable brackets are infinitely far"""
+    return [r.distance(price) if r is not None else float('inf') for r in ranges]
+
+def score_brackets(ranges: Sequence[Optional[GuessRange]], prices: Sequence[float]) -> list:
+    """Points per bracket for each candidate price, as a len(prices) x len(ranges) grid.
+
+    Brackets containing the price score 3. If none does, the closest
+    bracket(s) score 3 instead. This is the closest-wins rule yearly
+    polls use; monthly polls are scored by rules.Scorer.
+    """
+    if not ranges:
+        return [[] for _ in prices]
+    np = _numpy() if len(ranges) * len(prices) >= NUMPY_MIN_CELLS else None
+    if np is not None:
+        return _score_brackets_numpy(np, ranges, prices)
+    grid = []
+    for price in prices:
+        dist = bracket_distances(ranges, price)
+        best = min(dist)
+        grid.append([CORRECT_POINTS if d == best and best != float('inf') else 0 for d in dist])
+    return grid
+
+def distance_matrix(np, ranges, prices):
+    """bracket_distances for every price at once, as a len(prices) x len(ranges) array"""
+    lo = np.array([r.min if r is not None else np.inf for r in ranges], dtype=float)
+    hi = np.array([r.max if r is not None else -np.inf for r in ranges], dtype=float)
+    p = np.asarray(prices, dtype=float)[:, None]
+    with np.errstate(invalid='ignore'):
+        return np.where(p < lo, lo - p, np.where(p > hi, p - hi, 0.0))
+
+def _score_brackets_numpy(np, ranges, prices):
+    dist = distance_matrix(np, ranges, prices)
+    best = dist.min(axis=1, keepdims=True)
+    winners = (dist == best) & np.isfinite(best)
+    return np.where(winners, CORRECT_POINTS, 0).tolist()
+
+def group_by_bracket(votes) -> dict:
+    """Map each distinct guess string to the indexes of the model.Vote records that made it"""
+    groups = {}
+    for i, v in enumerate(votes):
+        groups.setdefault(v.guess, []).append(i)
+    return groups
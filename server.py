@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - HTTP Server
+
+Serves the pages app.py renders: the results page (streamed while it
+renders, with ETag/Last-Modified revalidation), the JSON API, screenshot
+variants, the /events stream and /metrics. Kept apart from app.py so that
+rendering or scoring from a script doesn't pay for importing the server.
+
+The same paths are served under /<group>/ for each group in groups.py,
+from that group's own site.
+
+Writes are POSTed as JSON with an "Authorization: Bearer <token>" header
+matching the WABV_ADMIN_TOKEN environment variable (unset: writes are off):
+
+    POST /api/polls/<kind>/<key>         open a poll       {"label": "June 2026"}
+    POST /api/polls/<kind>/<key>/votes   add a vote        {"name": "Zee", "guess": "$90k - $100k"}
+    POST /api/polls/<kind>/<key>/price   settle the close  {"price": 101000, "currency": "usd"}
+
+They go through the site's writes.WriteQueue, so a burst becomes one commit.
+"""
+
+import hmac
+import json
+import os
+import re
+import selectors
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import unquote, urlparse, parse_qs
+
+import images
+import metrics
+import writes
+
+ADMIN_TOKEN_ENV = 'WABV_ADMIN_TOKEN'
+MAX_WRITE_BYTES = 64 * 1024
+# http.server's own limit on one request or header line
+MAX_HEAD = 65536
+WRITE_RE = re.compile(r'^/api/polls/([^/]+)/([^/]+)(?:/(votes|price))?$')
+WRITE_ACTIONS = {None: writes.poll_event, 'votes': writes.vote_event, 'price': writes.price_event}
+
+def etag_matches(if_none_match, etag):
+    tags = [t.strip() for t in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+def not_modified(headers, page):
+    """True if the request's validators show the client already has the page"""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match:
+        return etag_matches(if_none_match, page.etag)
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return page.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class ChunkedWriter:
+    """Streams a page to the client with chunked transfer encoding while it renders"""
+
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.started = False
+        self.skip_body = False
+        self._buffer = []
+        self._buffered = 0
+
+    def start(self, page):
+        self.started = True
+        handler = self.handler
+        if not_modified(handler.headers, page):
+            self.skip_body = True
+            handler.send_response(304)
+            handler.send_validators(page)
+            handler.end_headers()
+            return
+        handler.send_response(200)
+        handler.send_header('Content-type', 'text/html; charset=utf-8')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.send_validators(page)
+        handler.end_headers()
+
+    def write(self, chunk):
+        if self.skip_body:
+            return
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._buffered:
+            data = b''.join(self._buffer)
+            with metrics.stage('write'):
+                self.handler.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self._buffer, self._buffered = [], 0
+
+    def finish(self):
+        if self.skip_body:
+            return
+        self.flush()
+        with metrics.stage('write'):
+            self.handler.wfile.write(b'0\r\n\r\n')
+
+ROUTES = {'/': 'page', '/index.html': 'page', '/events': 'events', '/metrics': 'metrics'}
+
+def route_name(path):
+    """Low-cardinality label for a request path"""
+    if path in ROUTES:
+        return ROUTES[path]
+    if path.startswith('/api/'):
+        return 'api'
+    if path.startswith('/img/'):
+        return 'image'
+    return 'static'
+
+REQUESTS = metrics.REGISTRY.counter('wabv_http_requests_total', "HTTP requests by route and status",
+                                    ['route', 'status'])
+REQUEST_SECONDS = metrics.REGISTRY.histogram('wabv_http_request_seconds', "HTTP request latency by route", ['route'])
+GROUP_REQUESTS = metrics.REGISTRY.counter('wabv_group_requests_total', "HTTP requests by group, route and status",
+                                          ['group', 'route', 'status'])
+GROUP_REQUEST_SECONDS = metrics.REGISTRY.histogram('wabv_group_request_seconds', "HTTP request latency by group",
+                                                   ['group'])
+
+class Handler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # A request that stalls part way gives its worker back after this many seconds
+    timeout = 5
+    # Headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    # Set after a request when the connection stays open for the server to park (see PooledHTTPServer)
+    idle = False
+
+    def handle(self):
+        if not self.server.parks_idle:
+            super().handle()
+            return
+        self.idle = False
+        self.close_connection = True
+        self.handle_one_request()
+        self.idle = not self.close_connection
+
+    def finish(self):
+        if not self.idle:
+            super().finish()
+
+    def resume(self):
+        """Handle the next request on a parked keep-alive connection"""
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def do_GET(self):
+        self.status = None
+        start = time.perf_counter()
+        group, path = self.select_site()
+        route = route_name(path)
+        profiler = self.server.profiler
+        with profiler.profile(f"{route} {self.path}") if profiler else nullcontext():
+            if path:
+                self.route(path)
+            else:
+                self.redirect_to_group(group)
+        self.record(group, route, time.perf_counter() - start)
+
+    def do_HEAD(self):
+        """The page's headers come from the page cache, as for GET; other paths keep the static handler's"""
+        self.status = None
+        start = time.perf_counter()
+        group, path = self.select_site()
+        route = route_name(path)
+        if not path:
+            self.redirect_to_group(group)
+        elif path in ('/', '/index.html'):
+            self.send_page(self.site.pages.get(), body=False)
+        else:
+            super().do_HEAD()
+        self.record(group, route, time.perf_counter() - start)
+
+    def do_POST(self):
+        self.status = None
+        start = time.perf_counter()
+        group, path = self.select_site()
+        self.write(path)
+        self.record(group, 'write', time.perf_counter() - start)
+
+    def select_site(self):
+        """Pick the site for the request's group and make self.path relative to it; returns (group, path)"""
+        url = urlparse(self.path)
+        group, self.site, path = self.server.sites.route(url.path)
+        if path != url.path:
+            self.path = path + (f'?{url.query}' if url.query else '')
+        return group, path
+
+    def redirect_to_group(self, group):
+        """/<group> becomes /<group>/, so the page's relative URLs stay in the group"""
+        self.send_response(301)
+        self.send_header('Location', f'/{group}/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def record(self, group, route, seconds):
+        REQUEST_SECONDS.observe(seconds, route)
+        REQUESTS.inc(route, str(self.status))
+        GROUP_REQUEST_SECONDS.observe(seconds, group)
+        GROUP_REQUESTS.inc(group, route, str(self.status))
+        self.server.sites.done(group, self.site)
+
+    def write(self, path):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_WRITE_BYTES:
+            self.close_connection = True
+            self.send_json(413, {'error': f"Request body over {MAX_WRITE_BYTES} bytes"})
+            return
+        raw = self.rfile.read(length)
+        match = WRITE_RE.match(path)
+        if not match:
+            self.send_json(404, {'error': "Not found"})
+            return
+        token = self.server.admin_token
+        if not token:
+            self.send_json(403, {'error': f"Writes are disabled; set {ADMIN_TOKEN_ENV} to enable them"})
+            return
+        if not hmac.compare_digest(self.headers.get('Authorization', '').encode(), f"Bearer {token}".encode()):
+            self.send_json(401, {'error': "Missing or wrong admin token"}, {'WWW-Authenticate': 'Bearer'})
+            return
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            self.send_json(400, {'error': "Expected a JSON object"})
+            return
+        kind, key, action = match[1], unquote(match[2]), match[3]
+        try:
+            event = WRITE_ACTIONS[action](kind, key, body)
+            self.site.write_queue().submit(event)
+        except writes.Rejected as e:
+            self.send_json(e.status, {'error': str(e)})
+            return
+        self.send_json(200 if action == 'price' else 201, {'ok': True, 'event': event})
+
+    def send_json(self, status, doc, headers=None):
+        body = json.dumps(doc, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+
+    def route(self, path):
+        if path in ('/', '/index.html'):
+            sink = ChunkedWriter(self) if self.request_version == self.protocol_version == 'HTTP/1.1' else None
+            page = self.site.pages.get(sink)
+            if not (sink and sink.started):
+                self.send_page(page)
+        elif path.startswith('/img/'):
+            self.send_image(path[len('/img/'):])
+        elif path.startswith('/api/'):
+            self.send_api(path, parse_qs(urlparse(self.path).query))
+        elif path == '/events':
+            self.send_events()
+        elif path == '/metrics':
+            self.send_metrics()
+        else:
+            super().do_GET()
+
+    def send_api(self, path, query):
+        accept_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        response = self.site.api.get().body.response(path, query, accept_gzip)
+        if response.status == 200 and etag_matches(self.headers.get('If-None-Match', ''), response.etag):
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.end_headers()
+            return
+        self.send_response(response.status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(response.body)))
+        if response.encoding:
+            self.send_header('Content-Encoding', response.encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def send_metrics(self):
+        body = metrics.REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        """Server-sent event stream; the socket is handed to the live-update hub"""
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        self.server.detach(self.connection)
+        self.site.live.subscribe(self.connection, self.headers.get('Last-Event-ID'))
+
+    def send_image(self, name):
+        """Content-addressed screenshot variant; its name changes with its bytes, so cache forever"""
+        match = images.NAME_RE.match(name)
+        path = images.CACHE_DIR / name
+        if not match or not path.is_file():
+            self.send_error(404, "Image not found")
+            return
+        if self.headers.get('If-None-Match') == f'"{name}"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        with open(path, 'rb') as f:
+            self.send_response(200)
+            self.send_header('Content-type', images.CONTENT_TYPES[match[1]])
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.send_header('ETag', f'"{name}"')
+            self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+            self.end_headers()
+            self.copyfile(f, self.wfile)
+
+    def send_page(self, page, body=True):
+        if not_modified(self.headers, page):
+            self.send_response(304)
+            self.send_validators(page)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page.body)))
+        self.send_validators(page)
+        self.end_headers()
+        if body:
+            with metrics.stage('write'):
+                self.wfile.write(page.body)
+
+    def send_validators(self, page):
+        self.send_header('ETag', page.etag)
+        self.send_header('Last-Modified', page.last_modified)
+        self.send_header('Cache-Control', 'no-cache')
+
+class SingleThreadHandler(Handler):
+    # Keep-alive would let one client hold the only thread, so close after each request
+    protocol_version = 'HTTP/1.0'
+
+class DetachingHTTPServer(HTTPServer):
+    """HTTPServer that leaves detached connections (event streams) open after their request"""
+
+    parks_idle = False
+
+    def __init__(self, server_address, handler_class):
+        super().__init__(server_address, handler_class)
+        self.detached = set()
+
+    def detach(self, request):
+        self.detached.add(request)
+
+    def shutdown_request(self, request):
+        if request in self.detached:
+            self.detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+class Waiting:
+    """A connection the pool isn't serving: new, or between keep-alive requests"""
+
+    __slots__ = ('request', 'client_address', 'handler', 'deadline')
+
+    def __init__(self, request, client_address, handler, deadline):
+        self.request = request
+        self.client_address = client_address
+        self.handler = handler
+        self.deadline = deadline
+
+def request_ready(sock) -> bool:
+    """Whether a worker can read sock's next request head without waiting on the client"""
+    try:
+        head = sock.recv(MAX_HEAD, socket.MSG_PEEK)
+    except BlockingIOError:
+        return False
+    except OSError:
+        # Let the handler run into the error and close the connection
+        return True
+    return not head or b'\n\r\n' in head or b'\n\n' in head or len(head) >= MAX_HEAD
+
+class PooledHTTPServer(DetachingHTTPServer):
+    """HTTPServer that runs requests on a fixed pool of worker threads.
+
+    A connection only holds a worker while one of its requests is being
+    handled. Until a whole request head has arrived (on a new connection,
+    or between keep-alive requests) it waits in a selector watched by one
+    thread, so idle browsers and clients that trickle their headers can't
+    use up the pool. A connection is closed after keepalive idle seconds,
+    or when its request head takes longer than the handler's timeout.
+    """
+
+    parks_idle = True
+    keepalive = 15
+    # socketserver's default backlog of 5 drops SYNs from a burst of new visitors, who then retry after a second
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=16):
+        super().__init__(server_address, handler_class)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._arrived = []
+        self._park_lock = threading.Lock()
+        self._closing = False
+        self._watcher = threading.Thread(target=self._watch, name='http-keepalive', daemon=True)
+        self._watcher.start()
+
+    def process_request(self, request, client_address):
+        self._wait(request, client_address, None)
+
+    def process_request_thread(self, request, client_address, handler=None):
+        """One request: a new connection's first (handler None) or a parked connection's next"""
+        try:
+            if handler is None:
+                handler = self.RequestHandlerClass(request, client_address, self)
+            else:
+                handler.resume()
+        except Exception:
+            self.handle_error(request, client_address)
+            handler = None
+        if handler is not None and handler.idle:
+            self._wait(request, client_address, handler)
+        else:
+            self.shutdown_request(request)
+
+    def _wait(self, request, client_address, handler):
+        """Hand the connection to the watcher until its next request head is in"""
+        if handler is not None and self._has_buffered(handler):
+            self._dispatch(Waiting(request, client_address, handler, None))
+            return
+        request.setblocking(False)
+        with self._park_lock:
+            if self._closing:
+                self._close(Waiting(request, client_address, handler, None))
+                return
+            self._arrived.append(Waiting(request, client_address, handler, time.monotonic() + self.keepalive))
+        self._wake_w.send(b'\0')
+
+    @staticmethod
+    def _has_buffered(handler) -> bool:
+        """Whether rfile already buffered (part of) the next request, which the selector wouldn't report"""
+        handler.connection.setblocking(False)
+        try:
+            return bool(handler.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            handler.connection.settimeout(handler.timeout)
+
+    def _dispatch(self, waiting):
+        waiting.request.settimeout(self.RequestHandlerClass.timeout)
+        try:
+            self.pool.submit(self.process_request_thread, waiting.request, waiting.client_address, waiting.handler)
+        except RuntimeError:
+            # The pool has shut down
+            self._close(waiting)
+
+    def _close(self, waiting):
+        if waiting.handler is not None:
+            waiting.handler.idle = False
+            waiting.handler.finish()
+        self.shutdown_request(waiting.request)
+
+    def _watch(self):
+        waiting = {}
+        # Connections part way through sending a request head; the selector would keep reporting them readable
+        partial = set()
+        while True:
+            for key, _ in self._selector.select(timeout=0.05 if partial else 1):
+                if key.fileobj is self._wake_r:
+                    self._wake_r.recv(4096)
+                    with self._park_lock:
+                        arrived, self._arrived = self._arrived, []
+                    for w in arrived:
+                        waiting[w.request] = w
+                        self._selector.register(w.request, selectors.EVENT_READ)
+                else:
+                    self._selector.unregister(key.fileobj)
+                    partial.add(key.fileobj)
+                    w = waiting[key.fileobj]
+                    w.deadline = min(w.deadline, time.monotonic() + self.RequestHandlerClass.timeout)
+            now = time.monotonic()
+            for sock in list(partial):
+                if request_ready(sock):
+                    partial.discard(sock)
+                    self._dispatch(waiting.pop(sock))
+            for sock, w in list(waiting.items()):
+                if w.deadline <= now or self._closing:
+                    if sock in partial:
+                        partial.discard(sock)
+                    else:
+                        self._selector.unregister(sock)
+                    del waiting[sock]
+                    self._close(w)
+            if self._closing:
+                with self._park_lock:
+                    arrived, self._arrived = self._arrived, []
+                for w in arrived:
+                    self._close(w)
+                return
+
+    def server_close(self):
+        super().server_close()
+        with self._park_lock:
+            self._closing = True
+        self._wake_w.send(b'\0')
+        self._watcher.join()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        # Let in-flight requests finish; connections still queued are dropped
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+def make_server(sites, host='localhost', port=8000, workers=16, profiler=None, writes=False):
+    """Build the HTTP server; workers=0 gives the original single-threaded server.
+
+    sites is a groups.Groups of app.Site objects (each with its page and
+    API RenderCaches, LiveUpdates and write queue), profiler an optional
+    metrics.SlowestProfiles, and writes whether the POST endpoints are on.
+    """
+    if workers <= 0:
+        server = DetachingHTTPServer((host, port), SingleThreadHandler)
+    else:
+        server = PooledHTTPServer((host, port), Handler, workers)
+    server.sites, server.profiler = sites, profiler
+    server.admin_token = os.environ.get(ADMIN_TOKEN_ENV) if writes else None
+    return server
+
+def serve(server):
+    """Serve until SIGINT/SIGTERM, then stop accepting and drain in-flight requests"""
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so it can't run on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.sites.close()
+
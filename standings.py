@@ -0,0 +1,114 @@
+"""
+WA Bitcoiners Vote - Incremental Standings
+
+StandingsEngine keeps every settled month's scored results plus running
+per-player totals, and can persist them as a derived snapshot next to
+data/polls.json. Syncing against new data only re-scores months whose
+content changed, so adding or correcting one month costs one month's work.
+"""
+
+import json
+import os
+import threading
+
+from model import Month, as_polls
+
+SNAPSHOT_VERSION = 1
+
+class StandingsEngine:
+    """Per-month results and per-player totals, updated one month at a time.
+
+    score_month(votes, price, month_key) takes model.Vote records and must return one
+    dict per vote with 'name', 'guess', 'points' and 'correct'. rule names the scorer; a
+    snapshot written under a different rule or price_key is ignored. Hold lock while
+    syncing and reading when the engine is shared between threads.
+    """
+
+    def __init__(self, score_month, rule: str, snapshot_path=None, price_key: str = 'bitcoin_usd_price'):
+        self.score_month = score_month
+        self.rule = rule
+        self.snapshot_path = snapshot_path
+        self.price_key = price_key
+        self.months = {}
+        self.players = {}
+        self.lock = threading.RLock()
+        if snapshot_path:
+            self.load()
+
+    def load(self):
+        try:
+            snapshot = json.loads(self.snapshot_path.read_text())
+        except (OSError, ValueError):
+            return
+        if (snapshot.get('version'), snapshot.get('rule'), snapshot.get('price_key')) != \
+                (SNAPSHOT_VERSION, self.rule, self.price_key):
+            return
+        self.months = snapshot['months']
+        self.players = snapshot['players']
+
+    def save(self):
+        snapshot = {'version': SNAPSHOT_VERSION, 'rule': self.rule, 'price_key': self.price_key,
+                    'months': self.months, 'players': self.players}
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, self.snapshot_path)
+
+    def sync(self, data) -> bool:
+        """Bring the engine up to date with data (a model.Polls or raw dict); True if anything changed"""
+        monthly = as_polls(data).months
+        changed = False
+        for key in [k for k in self.months if k not in monthly]:
+            self.remove_month(key)
+            changed = True
+        for key, month in monthly.items():
+            entry = self.months.get(key)
+            if entry and entry['fingerprint'] == month.fingerprint:
+                continue
+            self.update_month(month)
+            changed = True
+        if changed and self.snapshot_path:
+            self.save()
+        return changed
+
+    def update_month(self, month: Month):
+        """Score one month and fold it into the running totals"""
+        key = month.key
+        if key in self.months:
+            self.remove_month(key)
+        price = month.price(self.price_key)
+        results = self.score_month(month.votes, price, key) if price else []
+        self.months[key] = {
+            'fingerprint': month.fingerprint,
+            'label': month.label,
+            'price': price,
+            'results': results,
+        }
+        for i, r in enumerate(results):
+            player = self.players.setdefault(r['name'], {'name': r['name'], 'points': 0, 'wins': 0, 'votes': []})
+            player['points'] = round(player['points'] + r['points'], 2)
+            player['wins'] += 1 if r['correct'] else 0
+            player['votes'].append([key, i])
+
+    def remove_month(self, key: str):
+        """Take one month's results back out of the running totals"""
+        entry = self.months.pop(key)
+        for r in entry['results']:
+            player = self.players[r['name']]
+            player['points'] = round(player['points'] - r['points'], 2)
+            player['wins'] -= 1 if r['correct'] else 0
+        for name in {r['name'] for r in entry['results']}:
+            player = self.players[name]
+            player['votes'] = [v for v in player['votes'] if v[0] != key]
+            if not player['votes']:
+                del self.players[name]
+
+    def history(self, name: str) -> list:
+        """(month entry, result) pairs for one player, in month order"""
+        player = self.players.get(name)
+        if not player:
+            return []
+        return [(self.months[key], self.months[key]['results'][i]) for key, i in sorted(player['votes'])]
+
+    def standings(self) -> list:
+        """Players by points then wins; ties keep first-appearance order like a full recompute"""
+        return sorted(self.players.values(), key=lambda p: (-p['points'], -p['wins'], min(p['votes'])))
@@ -0,0 +1,74 @@
+"""
+WA Bitcoiners Vote - Startup Cache
+
+Cron jobs and bot hooks run calculate_points.py and app.py as fresh
+processes, and each run would otherwise parse and validate polls.json from
+scratch. load_polls() keeps the validated model.Polls as a pickle in
+.cache/startup, keyed on a hash of the code that builds it and of the data
+bytes, so a run with unchanged data only reads and unpickles one file. A
+change to either simply makes a new entry; stale ones are removed.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+import model
+from poll_log import JsonFileSource, open_source
+
+ROOT = Path(__file__).parent
+CACHE_DIR = ROOT / ".cache" / "startup"
+# Modules whose code decides what a parsed Polls looks like
+MODEL_SOURCES = ('model.py', 'guesses.py')
+
+_source_hashes = {}
+
+def source_hash(files=MODEL_SOURCES) -> str:
+    files = tuple(files)
+    if files not in _source_hashes:
+        h = hashlib.sha256()
+        for name in files:
+            h.update((ROOT / name).read_bytes())
+        _source_hashes[files] = h.hexdigest()
+    return _source_hashes[files]
+
+def cached(name: str, key: str, build, cache_dir: Path = CACHE_DIR):
+    """build()'s result, pickled under name and key; a missing or unreadable entry is rebuilt"""
+    path = cache_dir / f"{name}-{key[:32]}.pickle"
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+    value = build()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        for old in cache_dir.glob(f"{name}-*.pickle"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    except OSError:
+        # A read-only checkout still works, just without the cache
+        pass
+    return value
+
+def load_polls(data_file: Path, cache_dir: Path = CACHE_DIR) -> tuple:
+    """(digest, model.Polls) like model.load(open_source(data_file)), from the cache when the data is unchanged.
+
+    A poll log is folded from its own snapshot and read through model.load
+    as usual. Data that fails validation is never cached, so it raises
+    model.ValidationError on every run.
+    """
+    source = open_source(Path(data_file))
+    if not isinstance(source, JsonFileSource):
+        return model.load(source)
+    raw = source.path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    key = hashlib.sha256(f"{source_hash()}:{digest}".encode()).hexdigest()
+    name = 'polls-' + hashlib.sha256(str(source.path.resolve()).encode()).hexdigest()[:8]
+    return digest, cached(name, key, lambda: model.parse(json.loads(raw)), cache_dir)
@@ -0,0 +1,29 @@
+"""EventHub: non-blocking fan-out to event-stream sockets"""
+
+import socket
+import unittest
+
+from live import EventHub
+
+class EventHubTest(unittest.TestCase):
+    def test_flush_sends_what_a_full_socket_held_back(self):
+        hub = EventHub()
+        self.addCleanup(hub.close)
+        server, client = socket.socketpair()
+        self.addCleanup(client.close)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        hub.attach(server)
+        message = b'x' * 100_000
+        hub.publish(message)
+        received = b''
+        client.settimeout(1)
+        while len(received) < len(message):
+            try:
+                received += client.recv(65536)
+            except socket.timeout:
+                self.fail(f"only {len(received)} of {len(message)} bytes arrived")
+            hub.flush()
+        self.assertEqual(received, message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""PollLog: import, replay and compaction round trips"""
+
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from poll_log import DATA_FILE, PollLog, events_from_data, main
+
+class PollLogTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_file = Path(tmp.name) / "polls.json"
+        shutil.copy(DATA_FILE, self.data_file)
+        self.original = self.data_file.read_text()
+
+    def run_cli(self, *args):
+        with redirect_stdout(io.StringIO()):
+            main(['--data', str(self.data_file), *args])
+
+    def open_log(self, **kwargs) -> PollLog:
+        return PollLog(self.data_file.with_name("polls.log.jsonl"), self.data_file.with_name("polls.snapshot.json"),
+                       self.data_file, **kwargs)
+
+    def test_import_round_trip(self):
+        self.run_cli('import')
+        # Compaction re-exports polls.json byte for byte, key order included
+        self.assertEqual(self.data_file.read_text(), self.original)
+        self.assertEqual(self.open_log().state(), json.loads(self.original))
+
+    def test_replay_after_snapshot(self):
+        self.run_cli('import')
+        self.run_cli('create', 'monthly', '2030-01', 'January 2030')
+        self.run_cli('vote', 'monthly', '2030-01', 'Zee', '$90k - $100k')
+        self.run_cli('settle', 'monthly', '2030-01', '95000')
+        state = self.open_log().state()
+        self.assertEqual(state['monthly']['2030-01'], {'month': 'January 2030', 'bitcoin_usd_price': 95000,
+                                                       'participants': [{'name': 'Zee', 'guess': '$90k - $100k'}]})
+        # polls.json only changes on compaction
+        self.assertEqual(self.data_file.read_text(), self.original)
+        self.run_cli('compact')
+        self.assertEqual(json.loads(self.data_file.read_text()), state)
+        self.assertEqual(self.open_log().state(), state)
+
+    def test_versions_are_not_mutated(self):
+        self.data_file.with_name("polls.log.jsonl").touch()
+        log = self.open_log(snapshot_every=3)
+        log.append(*events_from_data(json.loads(self.original)))
+        before = log.state()
+        snapshot = json.dumps(before)
+        key = next(iter(before['monthly']))
+        log.append({'type': 'vote_added', 'kind': 'monthly', 'key': key, 'name': 'New', 'guess': '< $90k'},
+                   {'type': 'poll_created', 'kind': 'monthly', 'key': '2030-01', 'fields': {'month': 'January 2030'}})
+        self.assertEqual(json.dumps(before), snapshot)
+        after = log.state()
+        self.assertEqual(after['monthly'][key]['participants'][-1]['name'], 'New')
+        self.assertIn('2030-01', after['monthly'])
+        self.assertEqual(self.open_log().state(), after)
+
+    def test_bad_events_are_not_appended(self):
+        self.data_file.with_name("polls.log.jsonl").touch()
+        log = self.open_log()
+        with self.assertRaises(ValueError):
+            log.append({'type': 'vote_added', 'kind': 'monthly', 'key': '2030-01', 'name': 'Zee', 'guess': '< $90k'})
+        self.assertEqual(self.data_file.with_name("polls.log.jsonl").read_text(), '')
+
+if __name__ == '__main__':
+    unittest.main()
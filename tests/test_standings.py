@@ -0,0 +1,66 @@
+"""Incremental standings must match a full recompute"""
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from calculate_points import get_overall_standings
+
+BRACKETS = ['< $90k', '$90k - $100k', '$100k - $110k', '$110k - $120k', '> $120k']
+NAMES = ['Robert', 'Zee', 'OT', 'Van', 'Bren', 'Sam', 'Adrian', 'turbo']
+
+def random_month(rng, key):
+    voters = rng.sample(NAMES, rng.randint(1, len(NAMES)))
+    month = {'month': key, 'participants': [{'name': n, 'guess': rng.choice(BRACKETS)} for n in voters]}
+    if rng.random() < 0.8:
+        month['bitcoin_usd_price'] = rng.choice([rng.randrange(80, 130) * 1000, rng.uniform(80000, 130000)])
+    return month
+
+class StandingsEngineTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.snapshot = Path(tmp.name) / "polls.standings.json"
+
+    def assertSameStandings(self, data):
+        # Ties included: both must list players in the same order
+        self.assertEqual(get_overall_standings(data, self.snapshot), get_overall_standings(data))
+
+    def test_random_edits(self):
+        rng = random.Random(4)
+        data = {'monthly': {}, 'yearly': {}}
+        next_month = 0
+        for _ in range(200):
+            keys = list(data['monthly'])
+            action = rng.choice(['add', 'add', 'edit', 'delete'] if keys else ['add'])
+            if action == 'add':
+                key = f"{2020 + next_month // 12}-{next_month % 12 + 1:02d}"
+                next_month += 1
+                data['monthly'][key] = random_month(rng, key)
+            elif action == 'edit':
+                key = rng.choice(keys)
+                month = data['monthly'][key]
+                if rng.random() < 0.5 or not month['participants']:
+                    month['bitcoin_usd_price'] = rng.randrange(80, 130) * 1000
+                else:
+                    rng.choice(month['participants'])['guess'] = rng.choice(BRACKETS)
+            else:
+                del data['monthly'][rng.choice(keys)]
+            self.assertSameStandings(data)
+
+    def test_ties_keep_first_appearance_order(self):
+        data = {'monthly': {
+            '2026-01': {'month': 'January 2026', 'bitcoin_usd_price': 95000, 'participants': [
+                {'name': 'Zee', 'guess': '$90k - $100k'}, {'name': 'Adrian', 'guess': '$90k - $100k'},
+                {'name': 'Bren', 'guess': '> $120k'}, {'name': 'Sam', 'guess': '> $120k'}]},
+            '2026-02': {'month': 'February 2026', 'bitcoin_usd_price': 125000, 'participants': [
+                {'name': 'Sam', 'guess': '$90k - $100k'}, {'name': 'Bren', 'guess': '> $120k'},
+                {'name': 'Zee', 'guess': '> $120k'}, {'name': 'Van', 'guess': '> $120k'}]},
+        }, 'yearly': {}}
+        self.assertSameStandings(data)
+        self.assertEqual([s['name'] for s in get_overall_standings(data, self.snapshot)],
+                         ['Zee', 'Bren', 'Adrian', 'Van', 'Sam'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""WriteQueue: batched commits and conflict statuses"""
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from poll_log import JsonFileSource, PollLog
+from writes import Rejected, WriteQueue, poll_event, price_event, vote_event
+
+DATA = {'monthly': {'2026-01': {'month': 'January 2026', 'bitcoin_usd_price': 95000,
+                                'participants': [{'name': 'Zee', 'guess': '$90k - $100k'}]},
+                    '2026-02': {'month': 'February 2026', 'participants': [{'name': 'Zee', 'guess': '> $120k'}]}},
+        'yearly': {}}
+
+class WriteQueueTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "polls.json"
+        self.path.write_text(json.dumps(DATA))
+        self.commits = []
+        self.queue = WriteQueue(JsonFileSource(self.path), interval=0.2, on_commit=[lambda: self.commits.append(1)])
+        self.addCleanup(self.queue.stop)
+
+    def submit_all(self, events) -> list:
+        """Submit events from one thread each; returns each one's Rejected or None"""
+        errors = [None] * len(events)
+
+        def run(i):
+            try:
+                self.queue.submit(events[i])
+            except Rejected as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(events))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return errors
+
+    def test_burst_is_one_commit(self):
+        names = ['Bren', 'Sam', 'Van', 'OT', 'Adrian']
+        errors = self.submit_all([vote_event('monthly', '2026-02', {'name': n, 'guess': '$90k - $100k'})
+                                  for n in names])
+        self.assertEqual(errors, [None] * len(names))
+        self.assertEqual((self.queue.commits, len(self.commits)), (1, 1))
+        voters = [p['name'] for p in json.loads(self.path.read_text())['monthly']['2026-02']['participants']]
+        self.assertEqual(sorted(voters), sorted(['Zee'] + names))
+
+    def test_conflicts(self):
+        events = [poll_event('monthly', '2026-01', {}),
+                  vote_event('monthly', '2026-01', {'name': 'Sam', 'guess': '< $90k'}),
+                  vote_event('monthly', '2026-02', {'name': 'Zee', 'guess': '< $90k'}),
+                  vote_event('monthly', '2026-03', {'name': 'Sam', 'guess': '< $90k'}),
+                  price_event('monthly', '2026-02', {'price': 101000})]
+        errors = self.submit_all(events)
+        self.assertEqual([e and e.status for e in errors], [409, 409, 409, 404, None])
+        data = json.loads(self.path.read_text())
+        self.assertEqual(data['monthly']['2026-02']['bitcoin_usd_price'], 101000)
+        self.assertEqual(len(data['monthly']['2026-02']['participants']), 1)
+
+    def test_writes_in_one_batch_see_each_other(self):
+        errors = self.submit_all([poll_event('monthly', '2026-03', {})])
+        self.assertEqual(errors, [None])
+        errors = self.submit_all([vote_event('monthly', '2026-03', {'name': 'Sam', 'guess': '< $90k'}),
+                                  vote_event('monthly', '2026-03', {'name': 'Sam', 'guess': '> $120k'})])
+        self.assertEqual(sorted(e.status if e else 0 for e in errors), [0, 409])
+
+    def test_bad_requests(self):
+        with self.assertRaises(Rejected) as caught:
+            vote_event('monthly', '2026-02', {'name': 'Sam', 'guess': 'moon'})
+        self.assertEqual(caught.exception.status, 400)
+        with self.assertRaises(Rejected) as caught:
+            poll_event('weekly', '2026-02', {})
+        self.assertEqual(caught.exception.status, 404)
+
+    def test_poll_log_source(self):
+        log_path = self.path.with_name("polls.log.jsonl")
+        log_path.touch()
+        log = PollLog(log_path, self.path.with_name("polls.snapshot.json"), self.path)
+        queue = WriteQueue(log, interval=0.01)
+        self.addCleanup(queue.stop)
+        queue.submit(poll_event('monthly', '2026-03', {}))
+        queue.submit(vote_event('monthly', '2026-03', {'name': 'Sam', 'guess': '< $90k'}))
+        with self.assertRaises(Rejected) as caught:
+            queue.submit(vote_event('monthly', '2026-03', {'name': 'Sam', 'guess': '< $90k'}))
+        self.assertEqual(caught.exception.status, 409)
+        self.assertEqual(log.state()['monthly']['2026-03']['participants'], [{'name': 'Sam', 'guess': '< $90k'}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+WA Bitcoiners Vote - Write Queue
+
+Votes, settled prices and new polls arrive as poll log events (see
+poll_log.py) from app.py's POST endpoints. Rather than rewriting
+polls.json once per request, WriteQueue holds writes for a short window
+and commits the whole batch at once: under a lock on the data file it
+re-reads the data, checks each write, validates the result and then
+either rewrites polls.json atomically (temp file plus rename) or appends
+the batch to the poll log. Each request waits for the commit that includes
+it, so it learns whether its write landed. The read caches are invalidated
+after each commit, not on every write.
+"""
+
+import copy
+import json
+import threading
+import time
+from datetime import datetime
+
+import metrics
+import model
+from guesses import parse_guess
+from poll_log import PollLog, apply_event, file_lock, write_atomic
+
+WRITES = metrics.REGISTRY.counter('wabv_writes_total', "Writes by event type and result", ['type', 'result'])
+COMMITS = metrics.REGISTRY.histogram('wabv_write_batch_size', "Writes per commit",
+                                     buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500))
+
+class Rejected(ValueError):
+    """A write that can't be applied; status is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def _text(body: dict, field: str) -> str:
+    value = body.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise Rejected(f"'{field}' must be non-empty text")
+    return value.strip()
+
+def _poll_key(kind: str, key: str):
+    if kind not in ('monthly', 'yearly'):
+        raise Rejected(f"Unknown poll kind: {kind!r}", 404)
+    if kind == 'monthly' and not model.MONTH_KEY_RE.match(key):
+        raise Rejected("Month keys look like '2026-01'")
+    if kind == 'yearly' and not key.isdigit():
+        raise Rejected("Year keys look like '2027'")
+
+def vote_event(kind: str, key: str, body: dict) -> dict:
+    _poll_key(kind, key)
+    name, guess = _text(body, 'name'), _text(body, 'guess')
+    if parse_guess(guess) is None:
+        raise Rejected(f"Can't read {guess!r} as a price range")
+    return {'type': 'vote_added', 'kind': kind, 'key': key, 'name': name, 'guess': guess}
+
+def price_event(kind: str, key: str, body: dict) -> dict:
+    _poll_key(kind, key)
+    currency = str(body.get('currency', 'usd')).lower()
+    if f"bitcoin_{currency}_price" not in model.PRICE_ATTRS:
+        raise Rejected(f"Unknown currency: {currency!r}")
+    price = body.get('price')
+    if isinstance(price, bool) or not isinstance(price, (int, float)) or not 0 < price < float('inf'):
+        raise Rejected("'price' must be a positive number")
+    return {'type': 'price_settled', 'kind': kind, 'key': key, 'currency': currency,
+            'price': int(price) if float(price).is_integer() else price}
+
+def poll_event(kind: str, key: str, body: dict) -> dict:
+    _poll_key(kind, key)
+    if kind == 'monthly':
+        label = body.get('label') or datetime.strptime(key, '%Y-%m').strftime('%B %Y')
+        if not isinstance(label, str):
+            raise Rejected("'label' must be text")
+        fields = {'month': label}
+    else:
+        fields = {'year': int(key)}
+    return {'type': 'poll_created', 'kind': kind, 'key': key, 'fields': fields}
+
+def check_write(state: dict, event: dict):
+    """Raise Rejected if event conflicts with state"""
+    poll = state.get(event['kind'], {}).get(event['key'])
+    if event['type'] == 'poll_created':
+        if poll is not None:
+            raise Rejected(f"{event['kind']} poll {event['key']!r} already exists", 409)
+        return
+    if poll is None:
+        raise Rejected(f"No {event['kind']} poll {event['key']!r}", 404)
+    if event['type'] == 'vote_added':
+        if poll.get('bitcoin_usd_price') is not None:
+            raise Rejected(f"Voting on {event['key']} has closed", 409)
+        if any(p.get('name') == event['name'] for p in poll.get('participants', [])):
+            raise Rejected(f"{event['name']} has already voted in {event['key']}", 409)
+
+class Write:
+    def __init__(self, event: dict):
+        self.event = event
+        self.error = None
+        self.done = threading.Event()
+
+class WriteQueue:
+    """Coalesces writes into one atomic commit per interval seconds.
+
+    source is the app's poll source (poll_log.JsonFileSource or PollLog);
+    each on_commit callback runs after a commit that changed the data.
+    """
+
+    def __init__(self, source, interval: float = 0.05, on_commit=()):
+        self.source = source
+        self.interval = interval
+        self.on_commit = list(on_commit)
+        self.commits = 0
+        self._cond = threading.Condition()
+        self._queue = []
+        self._thread = None
+        self._stopping = False
+
+    def submit(self, event: dict, timeout: float = 10.0):
+        """Queue one event and wait until it is committed; raises Rejected"""
+        write = Write(event)
+        with self._cond:
+            if self._stopping:
+                raise Rejected("Server is shutting down", 503)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+            self._queue.append(write)
+            self._cond.notify()
+        if not write.done.wait(timeout):
+            raise Rejected("Timed out waiting for the write to commit", 503)
+        WRITES.inc(event['type'], 'rejected' if write.error else 'committed')
+        if write.error:
+            raise write.error
+
+    def stop(self):
+        """Commit whatever is queued, then stop the flusher"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread:
+            thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+            # Let the rest of a burst arrive so it lands in the same commit
+            if not self._stopping:
+                time.sleep(self.interval)
+            with self._cond:
+                batch, self._queue = self._queue, []
+            self.commit(batch)
+
+    def commit(self, batch: list):
+        """Apply a batch under the data file lock and write it in one go"""
+        accepted = []
+        try:
+            with file_lock(self.source.path):
+                state = self._read()
+                for write in batch:
+                    try:
+                        check_write(state, write.event)
+                    except Rejected as e:
+                        write.error = e
+                        continue
+                    apply_event(state, write.event)
+                    accepted.append(write)
+                if accepted:
+                    model.parse(state)
+                    self._write(state, [w.event for w in accepted])
+            if accepted:
+                self.commits += 1
+                COMMITS.observe(len(accepted))
+                for callback in self.on_commit:
+                    callback()
+        except Exception as e:
+            for write in accepted:
+                write.error = Rejected(f"Commit failed: {e}", 400 if isinstance(e, model.ValidationError) else 500)
+        finally:
+            for write in batch:
+                write.done.set()
+
+    def _read(self) -> dict:
+        if isinstance(self.source, PollLog):
+            # state() is shared with readers, so work on a copy until the append
+            return copy.deepcopy(self.source.state())
+        return json.loads(self.source.path.read_bytes())
+
+    def _write(self, state: dict, events: list):
+        if isinstance(self.source, PollLog):
+            self.source.append(*events)
+        else:
+            write_atomic(self.source.path, json.dumps(state, indent=2, ensure_ascii=False) + '\n')
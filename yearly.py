@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+WA Bitcoiners Vote - Yearly Resolution
+
+Yearly predictions are closest-wins (rules.RULES['closest-wins']): brackets
+containing the closing price win, and if none does the closest bracket(s)
+win instead, as decided by scoring.score_brackets. Monthly polls score
+differently, through rules.Scorer with the standard rule (3 points for the
+right bracket, 1 for the closest miss).
+
+YearlyIndex precomputes the answer for every price at once. The winners can
+only change at a bracket boundary or halfway between two boundaries (where
+the closest bracket switches), so those points split the price line into
+regions with a fixed set of winners. "Who wins at P" is then a binary
+search, and sweep() walks a sorted price grid through the regions in one
+pass.
+
+Usage:
+    python3 yearly.py 2026                  # leaders at the latest monthly close
+    python3 yearly.py 2026 --price 150000   # winners if it closed at $150k
+    python3 yearly.py 2026 --table          # winning bracket for every price range
+"""
+
+import argparse
+from bisect import bisect_left
+from typing import NamedTuple
+
+from model import as_votes
+from scoring import CORRECT_POINTS, group_by_bracket, score_brackets
+
+class Region(NamedTuple):
+    """A stretch of prices with the same winners; low == high for a single point"""
+    low: float
+    high: float
+    brackets: tuple
+
+class YearlyIndex:
+    """Interval index over one yearly poll's brackets"""
+
+    def __init__(self, participants):
+        """participants may be dicts from polls.json or model.Vote records"""
+        self.votes = as_votes(participants)
+        groups = group_by_bracket(self.votes)
+        self.brackets = list(groups)
+        self.ranges = [self.votes[indexes[0]].range for indexes in groups.values()]
+
+        bounds = sorted({v for r in self.ranges if r is not None for v in (r.min, r.max) if v != float('inf')})
+        self.points = sorted(set(bounds) | {(a + b) / 2 for a, b in zip(bounds, bounds[1:])})
+        # Region 2i is the open interval just below points[i], region 2i+1 is points[i] itself
+        samples = []
+        for i, p in enumerate(self.points):
+            below = self.points[i - 1] if i else p - max(abs(p), 1.0)
+            samples += [(below + p) / 2, p]
+        samples.append(self.points[-1] + max(abs(self.points[-1]), 1.0) if self.points else 0.0)
+        grid = score_brackets(self.ranges, samples) if self.ranges else [[] for _ in samples]
+        self.winners = [tuple(b for b, points in enumerate(row) if points) for row in grid]
+
+    def region(self, price: float) -> int:
+        i = bisect_left(self.points, price)
+        return 2 * i + 1 if i < len(self.points) and self.points[i] == price else 2 * i
+
+    def winning_brackets(self, price: float) -> list:
+        """Bracket strings that win if the year closes at price"""
+        return [self.brackets[b] for b in self.winners[self.region(price)]]
+
+    def winners_at(self, price: float) -> list:
+        """Names of everyone whose bracket wins at price, in vote order"""
+        won = set(self.winning_brackets(price))
+        return [v.name for v in self.votes if v.guess in won]
+
+    def score(self, price: float) -> list:
+        """Per-vote results, shaped like a scored month"""
+        won = set(self.winning_brackets(price))
+        return [{'name': v.name, 'guess': v.guess, 'points': CORRECT_POINTS if v.guess in won else 0,
+                 'correct': v.range is not None and v.range.contains(price)} for v in self.votes]
+
+    def sweep(self, prices: list) -> list:
+        """Winning brackets for each price in a grid, as (price, [bracket, ...]) in input order.
+
+        The grid is walked in sorted order alongside the regions, so the
+        whole table costs one pass rather than a search per price.
+        """
+        order = sorted(range(len(prices)), key=prices.__getitem__)
+        table = [None] * len(prices)
+        i = 0
+        for j in order:
+            price = prices[j]
+            while i < len(self.points) and self.points[i] < price:
+                i += 1
+            region = 2 * i + 1 if i < len(self.points) and self.points[i] == price else 2 * i
+            table[j] = (price, [self.brackets[b] for b in self.winners[region]])
+        return table
+
+    def table(self) -> list:
+        """Every region with its winning brackets, merging neighbours that share winners"""
+        regions = []
+        edges = [float('-inf')] + [p for p in self.points for _ in (0, 1)] + [float('inf')]
+        for k, winners in enumerate(self.winners):
+            low, high = edges[k], edges[k + 1]
+            brackets = tuple(self.brackets[b] for b in winners)
+            if regions and regions[-1].brackets == brackets:
+                regions[-1] = regions[-1]._replace(high=high)
+            else:
+                regions.append(Region(low, high, brackets))
+        return regions
+
+def latest_close(data: dict):
+    """The most recent settled monthly USD close, as (month label, price), or (None, None)"""
+    for month in reversed(list(data.get('monthly', {}).values())):
+        if month.get('bitcoin_usd_price'):
+            return month.get('month'), month['bitcoin_usd_price']
+    return None, None
+
+def main(argv=None):
+    from calculate_points import DATA_FILE
+    from poll_log import open_source
+
+    parser = argparse.ArgumentParser(description="Resolve WA Bitcoiners Vote yearly predictions")
+    parser.add_argument('year', help="yearly poll, e.g. 2026")
+    parser.add_argument('--price', type=float, help="closing price to resolve at (default: the year's price, "
+                                                    "else the latest monthly close)")
+    parser.add_argument('--table', action='store_true', help="print the winning bracket for every price range")
+    args = parser.parse_args(argv)
+
+    data = open_source(DATA_FILE).read()[1]
+    poll = data.get('yearly', {}).get(args.year)
+    if poll is None:
+        parser.error(f"no yearly poll {args.year!r}")
+    index = YearlyIndex(poll.get('participants', []))
+
+    if args.table:
+        for r in index.table():
+            if r.low == r.high:
+                where = f"exactly ${r.low:,.0f}"
+            elif r.low == float('-inf'):
+                where = f"below ${r.high:,.0f}"
+            elif r.high == float('inf'):
+                where = f"above ${r.low:,.0f}"
+            else:
+                where = f"${r.low:,.0f} to ${r.high:,.0f}"
+            print(f"  {where}: {', '.join(r.brackets) or '-'}")
+        return
+
+    label, price = ("what if", args.price) if args.price else (f"{args.year} close", poll.get('bitcoin_usd_price'))
+    if price is None:
+        label, price = latest_close(data)
+        label = f"latest close ({label})"
+    if price is None:
+        parser.error("no price to resolve at; pass --price")
+    print(f"🎯 {args.year} at ${price:,.0f} USD, {label}")
+    for r in index.score(price):
+        if r['points']:
+            print(f"  {'🎯' if r['correct'] else '📏'} {r['name']}: {r['guess']} - {r['points']} pts")
+
+if __name__ == "__main__":
+    main()